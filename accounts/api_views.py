@@ -8,9 +8,12 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from foodOnline_main.throttling import LoginThrottle, PasswordResetThrottle
 from vendor.models import Vendor
 from vendor.serializers import VendorSerializer
 
+from .authentication import (issue_token, revoke_token, revoke_user_tokens,
+                             rotate_token, token_expires_at)
 from .models import User, UserProfile
 from .serializers import (LoginSerializer, PasswordResetSerializer,
                           UserDetailSerializer, UserSerializer)
@@ -79,6 +82,8 @@ class RegisterVendorView(APIView):
 
 
 class LoginView(APIView):
+    throttle_classes = [LoginThrottle]
+
     def post(self, request, *args, **kwargs):
         serializer = LoginSerializer(data=request.data)
         if serializer.is_valid():
@@ -88,8 +93,11 @@ class LoginView(APIView):
 
             if user is not None:
                 auth_login(request, user)
-                token, created = Token.objects.get_or_create(user=user)
-                return Response({"token": token.key}, status=status.HTTP_200_OK)
+                token = issue_token(user)
+                return Response(
+                    {"token": token.key, "expires": token_expires_at(token)},
+                    status=status.HTTP_200_OK,
+                )
             else:
                 return Response(
                     {"error": "Invalid login credentials"},
@@ -100,11 +108,31 @@ class LoginView(APIView):
 
 class LogoutView(APIView):
     def post(self, request, *args, **kwargs):
-        request.user.auth_token.delete()  # Delete the current user's token
+        if isinstance(request.auth, Token):
+            revoke_token(request.auth)
+        elif request.user.is_authenticated:
+            revoke_user_tokens(request.user)
         auth_logout(request)
         return Response({"message": "You are logged out."}, status=status.HTTP_200_OK)
 
 
+class TokenRefreshView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        # Swap the token used for this request for a new one, the old one stops working right away
+        if not isinstance(request.auth, Token):
+            return Response(
+                {"error": "Token authentication required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        token = rotate_token(request.auth)
+        return Response(
+            {"token": token.key, "expires": token_expires_at(token)},
+            status=status.HTTP_200_OK,
+        )
+
+
 class UserDetailView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -136,6 +164,8 @@ class UserDetailView(APIView):
 
 
 class PasswordResetView(APIView):
+    throttle_classes = [PasswordResetThrottle]
+
     def post(self, request):
         serializer = PasswordResetSerializer(data=request.data)
         if serializer.is_valid():
@@ -0,0 +1,118 @@
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from foodOnline_main.caching import make_key
+
+TOKEN_CACHE = "default"
+
+
+def _token_keys(key):
+    # Never keep the raw token in the cache, a dump of it would hand out credentials
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return make_key("token", digest), make_key("token", "revoked", digest)
+
+
+def token_cache():
+    """
+    The cache for tokens, ``None`` when it is local to the process: other
+    workers would keep accepting a revoked token until their copy expires.
+    """
+    cache = caches[TOKEN_CACHE]
+    return None if isinstance(cache, LocMemCache) else cache
+
+
+def token_expires_at(token):
+    return token.created + timedelta(seconds=settings.API_TOKEN_TTL)
+
+
+def token_age(token):
+    return (timezone.now() - token.created).total_seconds()
+
+
+def issue_token(user):
+    """
+    Return the user's token, replacing it with a new one once it is older
+    than ``API_TOKEN_ROTATE_AFTER``. Safe against concurrent logins.
+    """
+    token = Token.objects.filter(user=user).first()
+    if token is not None:
+        if token_age(token) < settings.API_TOKEN_ROTATE_AFTER:
+            return token
+        revoke_token(token)
+    try:
+        with transaction.atomic():
+            return Token.objects.create(user=user)
+    except IntegrityError:
+        # A concurrent login created the token first, share it
+        return Token.objects.get(user=user)
+
+
+def rotate_token(token):
+    """Revoke ``token`` and issue a fresh one for its user."""
+    revoke_token(token)
+    return issue_token(token.user)
+
+
+def revoke_token(token):
+    """
+    Put the token on the revocation list, then drop it.
+
+    The revocation marker is a single write to the shared cache, checked
+    before the cached user, so every process stops accepting the token at
+    once. Without a shared cache tokens aren't cached and the deleted row is
+    enough.
+    """
+    cache = token_cache()
+    if cache is not None:
+        user_key, revoked_key = _token_keys(token.key)
+        cache.set(revoked_key, True, settings.API_TOKEN_TTL)
+        cache.delete(user_key)
+    Token.objects.filter(key=token.key).delete()
+
+
+def revoke_user_tokens(user):
+    for token in Token.objects.filter(user=user):
+        revoke_token(token)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    ``TokenAuthentication`` that caches token -> user for
+    ``API_TOKEN_CACHE_TIMEOUT`` seconds in a shared cache and rejects expired
+    or revoked tokens.
+    """
+
+    def authenticate_credentials(self, key):
+        cache = token_cache()
+        user_key, revoked_key = _token_keys(key)
+        # One round trip for both the revocation list and the cached user
+        found = cache.get_many([user_key, revoked_key]) if cache is not None else {}
+        if found.get(revoked_key):
+            raise exceptions.AuthenticationFailed("Invalid token.")
+
+        if user_key in found:
+            user, token = found[user_key]
+        else:
+            try:
+                token = Token.objects.select_related("user").get(key=key)
+            except Token.DoesNotExist:
+                raise exceptions.AuthenticationFailed("Invalid token.")
+            user = token.user
+            remaining = (token_expires_at(token) - timezone.now()).total_seconds()
+            if cache is not None and remaining > 0:
+                cache.set(user_key, (user, token), min(settings.API_TOKEN_CACHE_TIMEOUT, int(remaining) + 1))
+
+        if token_expires_at(token) <= timezone.now():
+            raise exceptions.AuthenticationFailed("Token has expired.")
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed("User inactive or deleted.")
+        return user, token
@@ -1,18 +1,32 @@
+from django.utils.functional import SimpleLazyObject
+
+from foodOnline_main.caching import get_tag_versions, make_key
 from vendor.models import Vendor
 from accounts.models import UserProfile
 
 
 def get_vendor(request):
-    try:
-        vendor = Vendor.objects.get(user=request.user)
-    except:
-        vendor = None
-    return dict(vendor=vendor)
+    def vendor():
+        try:
+            return Vendor.objects.get(user=request.user)
+        except:
+            return None
+    return dict(vendor=SimpleLazyObject(vendor))
 
 
 def get_user_profile(request):
-    try:
-        user_profile = UserProfile.objects.get(user=request.user)
-    except:
-        user_profile = None
-    return dict(user_profile=user_profile)
+    def user_profile():
+        try:
+            return UserProfile.objects.get(user=request.user)
+        except:
+            return None
+    return dict(user_profile=SimpleLazyObject(user_profile))
+
+
+def get_fragment_revision(request):
+    # Part of the cache key of the navbar/sidebar fragments, bumped whenever the
+    # user's profile, vendor or cart changes.
+    if not request.user.is_authenticated:
+        return dict(fragment_revision=0)
+    tag = make_key("user", request.user.pk)
+    return dict(fragment_revision=get_tag_versions([tag])[tag])
@@ -0,0 +1,61 @@
+import time
+
+from django.contrib.auth.hashers import get_hashers
+from django.core.management.base import BaseCommand
+
+from accounts.hashers import TunedArgon2PasswordHasher, TunedScryptPasswordHasher
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure password hashes/sec of one worker for the configured PASSWORD_HASHERS "
+        "and for candidate scrypt (N,r,p) or argon2 (time,memory KiB,parallelism) parameters."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seconds", type=float, default=2.0, help="Time spent on each hasher")
+        parser.add_argument("--scrypt", action="append", default=[], metavar="N,r,p")
+        parser.add_argument("--argon2", action="append", default=[], metavar="t,m,p")
+
+    def candidates(self, options):
+        for hasher in get_hashers():
+            yield hasher
+        for params in options["scrypt"]:
+            n, r, p = (int(value) for value in params.split(","))
+            yield type(
+                "ScryptCandidate", (TunedScryptPasswordHasher,), {"work_factor": n, "block_size": r, "parallelism": p}
+            )()
+        for params in options["argon2"]:
+            t, m, p = (int(value) for value in params.split(","))
+            yield type(
+                "Argon2Candidate", (TunedArgon2PasswordHasher,), {"time_cost": t, "memory_cost": m, "parallelism": p}
+            )()
+
+    def describe(self, hasher):
+        if isinstance(hasher, TunedScryptPasswordHasher):
+            return f"N={hasher.work_factor} r={hasher.block_size} p={hasher.parallelism}"
+        if isinstance(hasher, TunedArgon2PasswordHasher):
+            return f"t={hasher.time_cost} m={hasher.memory_cost}KiB p={hasher.parallelism}"
+        return f"iterations={getattr(hasher, 'iterations', '-')}"
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'hasher':<24} {'parameters':<32} {'ms/hash':>9} {'hashes/s':>9}")
+        for hasher in self.candidates(options):
+            try:
+                salt = hasher.salt()
+                hasher.encode("correct horse battery staple", salt)
+            except (ValueError, ImportError) as e:
+                self.stdout.write(f"{hasher.algorithm:<24} {self.describe(hasher):<32} skipped: {e}")
+                continue
+
+            count = 0
+            start = time.perf_counter()
+            deadline = start + options["seconds"]
+            while time.perf_counter() < deadline:
+                hasher.encode("correct horse battery staple", salt)
+                count += 1
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"{hasher.algorithm:<24} {self.describe(hasher):<32} "
+                f"{elapsed / count * 1000:>9.1f} {count / elapsed:>9.1f}"
+            )
@@ -0,0 +1,63 @@
+from importlib import import_module
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import User
+
+ENGINES = [
+    "django.contrib.sessions.backends.db",
+    "django.contrib.sessions.backends.cached_db",
+    "foodOnline_main.sessions",
+]
+PAGES = ["/", "/marketplace/", "/cart/", "/custDashboard/"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Count django_session reads and writes per page for a logged in customer "
+        "with every session engine, through the full middleware stack, and the writes "
+        "of a session saved with the data it was loaded with."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--email", help="Customer to log in as, defaults to the first one")
+        parser.add_argument("--rounds", type=int, default=20)
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(role=User.CUSTOMER, is_active=True)
+        user = users.filter(email=options["email"]).first() if options["email"] else users.first()
+        if user is None:
+            raise CommandError("No active customer to log in as.")
+
+        self.stdout.write(f"{'engine':<45} {'reads/page':>10} {'writes/page':>11} {'unchanged save':>14}")
+        for engine in ENGINES:
+            with override_settings(SESSION_ENGINE=engine, ALLOWED_HOSTS=["*"]):
+                client = Client()
+                client.force_login(user)
+                reads = writes = 0
+                for _ in range(options["rounds"]):
+                    for page in PAGES:
+                        with CaptureQueriesContext(connection) as queries:
+                            client.get(page)
+                        for query in queries:
+                            if "django_session" not in query["sql"]:
+                                continue
+                            if query["sql"].lstrip().upper().startswith("SELECT"):
+                                reads += 1
+                            else:
+                                writes += 1
+
+                # A view assigning a value the session already holds still marks it modified
+                session = import_module(engine).SessionStore(client.session.session_key)
+                session["_auth_user_id"] = session["_auth_user_id"]
+                with CaptureQueriesContext(connection) as queries:
+                    session.save()
+                unchanged = sum("django_session" in query["sql"] for query in queries)
+                client.logout()
+            pages = options["rounds"] * len(PAGES)
+            self.stdout.write(
+                f"{engine:<45} {reads / pages:>10.2f} {writes / pages:>11.2f} {unchanged:>14}"
+            )
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.15 on 2026-10-19 19:10
+
+from django.db import migrations, models
+import renditions.utils
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_userprofile_location'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userprofile',
+            name='cover_photo',
+            field=models.ImageField(blank=True, null=True, upload_to=renditions.utils.HashedUploadTo('users/cover_photos', 'cover_photo')),
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='profile_picture',
+            field=models.ImageField(blank=True, null=True, upload_to=renditions.utils.HashedUploadTo('users/profile_pictures', 'profile_picture')),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.15 on 2026-10-19 20:02
+
+from django.db import migrations
+import renditions.utils
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_alter_userprofile_cover_photo_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userprofile',
+            name='cover_photo',
+            field=renditions.utils.HashedImageField(blank=True, null=True, upload_to=renditions.utils.HashedUploadTo('users/cover_photos', 'cover_photo')),
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='profile_picture',
+            field=renditions.utils.HashedImageField(blank=True, null=True, upload_to=renditions.utils.HashedUploadTo('users/profile_pictures', 'profile_picture')),
+        ),
+    ]
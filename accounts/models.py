@@ -2,6 +2,8 @@ from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
 from django.db import models
 from django.db.models.fields.related import OneToOneField
 
+from renditions.utils import HashedImageField, HashedUploadTo
+
 
 # Create your models here.
 class UserManager(BaseUserManager):
@@ -87,11 +89,15 @@ class User(AbstractBaseUser):
 
 class UserProfile(models.Model):
     user = OneToOneField(User, on_delete=models.CASCADE, blank=True, null=True)
-    profile_picture = models.ImageField(
-        upload_to="users/profile_pictures", blank=True, null=True
+    profile_picture = HashedImageField(
+        upload_to=HashedUploadTo("users/profile_pictures", "profile_picture"),
+        blank=True,
+        null=True,
     )
-    cover_photo = models.ImageField(
-        upload_to="users/cover_photos", blank=True, null=True
+    cover_photo = HashedImageField(
+        upload_to=HashedUploadTo("users/cover_photos", "cover_photo"),
+        blank=True,
+        null=True,
     )
     address = models.CharField(max_length=250, blank=True, null=True)
     country = models.CharField(max_length=15, blank=True, null=True)
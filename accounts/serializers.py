@@ -1,7 +1,26 @@
+from django.contrib.auth.tokens import default_token_generator
 from rest_framework import serializers
-from rest_framework.authtoken.models import Token
 
+from renditions.fields import RenditionsField
+
+from .authentication import revoke_user_tokens
 from .models import User, UserProfile
+from .validators import allow_only_images_validator
+
+
+class ValidatedImageField(serializers.ImageField):
+    """ImageField with the same checks as the forms (see accounts.validators)."""
+
+    def __init__(self, **kwargs):
+        kwargs["validators"] = [*kwargs.get("validators", []), allow_only_images_validator]
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        # Report why ImageUploadHandler refused the file instead of "invalid image"
+        upload_error = getattr(data, "upload_error", None)
+        if upload_error:
+            raise serializers.ValidationError(upload_error, code="upload_error")
+        return super().to_internal_value(data)
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -55,11 +74,18 @@ class UserSerializer(serializers.ModelSerializer):
 
 
 class UserProfileSerializer(serializers.ModelSerializer):
+    profile_picture = ValidatedImageField(required=False, allow_null=True)
+    cover_photo = ValidatedImageField(required=False, allow_null=True)
+    profile_picture_renditions = RenditionsField(source="profile_picture")
+    cover_photo_renditions = RenditionsField(source="cover_photo")
+
     class Meta:
         model = UserProfile
         fields = [
             "profile_picture",
+            "profile_picture_renditions",
             "cover_photo",
+            "cover_photo_renditions",
             "address",
             "country",
             "state",
@@ -140,10 +166,8 @@ class PasswordResetSerializer(serializers.Serializer):
                 {"email": "User with this email does not exist"}
             )
 
-        # Validate the token
-        try:
-            token = Token.objects.get(key=token_key, user=user)
-        except Token.DoesNotExist:
+        # The token is the one mailed by forgot_password, not the API auth token
+        if not default_token_generator.check_token(user, token_key):
             raise serializers.ValidationError({"token": "Invalid or expired token"})
 
         return data
@@ -155,5 +179,7 @@ class PasswordResetSerializer(serializers.Serializer):
         user = User.objects.get(email=email)
         user.set_password(new_password)
         user.save()
+        # Whoever knew the old password may hold a token, log them out of the API
+        revoke_user_tokens(user)
 
         return user
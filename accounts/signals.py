@@ -1,6 +1,8 @@
 from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 
+from foodOnline_main.caching import invalidate_tags, make_key
+
 from .models import User, UserProfile
 
 
@@ -20,3 +22,12 @@ def post_save_create_profile_receiver(sender, instance, created, **kwargs):
 @receiver(pre_save, sender=User)
 def pre_save_profile_receiver(sender, instance, **kwargs):
     pass
+
+
+@receiver(post_save, sender=UserProfile)
+def post_save_invalidate_profile_receiver(sender, instance, created, **kwargs):
+    if instance.user_id:
+        invalidate_tags(make_key("user", instance.user_id))
+    # Vendor listings are cached together with the vendor's profile
+    if instance.user and instance.user.role == User.VENDOR:
+        invalidate_tags("vendors")
@@ -1,3 +1,235 @@
-from django.test import TestCase
+import datetime
+import io
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.forms import modelform_factory
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from rest_framework import serializers
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from foodOnline_main.throttling import Limiter, check_limits, ip_identity, post_field_identity
+
+from .authentication import issue_token, revoke_token, token_cache
+from .forms import UserProfileForm
+from .models import User, UserProfile
+from .serializers import ValidatedImageField
+
+RATES = {"login": "2/m", "password_reset": "5/h", "cart": "120/m"}
+# The start of a minute, so the sliding windows don't roll over during a test
+NOW = 1_700_000_040.0
+
+
+def create_user(username, password="secret"):
+    user = User.objects.create_user(
+        first_name=username.title(), last_name="Test", username=username,
+        email=f"{username}@example.com", password=password,
+    )
+    user.role, user.is_active = User.CUSTOMER, True
+    user.save()
+    return user
+
+
+@mock.patch("foodOnline_main.throttling.time.time", mock.Mock(return_value=NOW))
+class ThrottlingTests(TestCase):
+    def setUp(self):
+        for alias in caches:
+            caches[alias].clear()
+        self.limiter = Limiter()
+
+    def test_limits_to_the_rate(self):
+        self.assertEqual([self.limiter.hit("k", "2/m")[0] for _ in range(3)], [True, True, False])
+
+    def test_rejected_requests_dont_count(self):
+        for _ in range(5):
+            self.limiter.hit("k", "2/m")
+
+        self.limiter.refund("k", "2/m")
+
+        # Only the two allowed requests were counted, one of them given back
+        self.assertEqual(self.limiter.hit("k", "2/m")[0], True)
+        self.assertEqual(self.limiter.hit("k", "2/m")[0], False)
+
+    def test_a_rejected_request_is_refunded_by_the_limits_it_passed(self):
+        request = RequestFactory().post("/", {"email": "asha@example.com"})
+        strict = (lambda request: "strict", "1/m")
+        loose = (lambda request: "loose", "2/m")
+
+        self.assertIsNone(check_limits(request, "login", [loose, strict]))
+        self.assertIsNotNone(check_limits(request, "login", [loose, strict]))
+
+        # The second request was refused by "strict", "loose" only counts the first
+        self.assertIsNone(check_limits(request, "login", [loose]))
+        self.assertIsNotNone(check_limits(request, "login", [loose]))
+
+    def test_email_limits_are_per_address(self):
+        identity = post_field_identity("email")
+        factory = RequestFactory()
+        attacker = factory.post("/", {"email": "Asha@example.com "}, REMOTE_ADDR="10.0.0.1")
+        victim = factory.post("/", {"email": "asha@example.com"}, REMOTE_ADDR="10.0.0.2")
+
+        self.assertNotEqual(identity(attacker), identity(victim))
+        self.assertTrue(identity(attacker).startswith(ip_identity(attacker)))
+        self.assertIsNone(identity(factory.post("/", {})))
+
+    @override_settings(THROTTLE_RATES=RATES)
+    def test_login_attempts_from_elsewhere_dont_lock_the_user_out(self):
+        create_user("asha")
+        client = APIClient()
+        url = reverse("api_login")
+        wrong = {"email": "asha@example.com", "password": "wrong"}
+
+        statuses = [client.post(url, wrong, REMOTE_ADDR="10.0.0.1").status_code for _ in range(3)]
+        response = client.post(url, {"email": "asha@example.com", "password": "secret"}, REMOTE_ADDR="10.0.0.2")
+
+        self.assertEqual(statuses, [400, 400, 429])
+        self.assertEqual(response.status_code, 200)
+
+
+class TokenTests(TestCase):
+    def setUp(self):
+        for alias in caches:
+            caches[alias].clear()
+        self.user = create_user("asha")
+        self.client = APIClient()
+
+    def login(self):
+        response = self.client.post(reverse("api_login"), {"email": "asha@example.com", "password": "secret"})
+        self.client.logout()
+        return response.json()["token"]
+
+    def get_details(self, key):
+        return self.client.get(reverse("user-details"), HTTP_AUTHORIZATION=f"Token {key}")
+
+    def age(self, seconds):
+        Token.objects.update(created=timezone.now() - datetime.timedelta(seconds=seconds))
+
+    def test_login_hands_out_a_working_token(self):
+        key = self.login()
+
+        self.assertEqual(self.get_details(key).status_code, 200)
+        self.assertEqual(self.get_details("not-a-token").status_code, 401)
+
+    @override_settings(API_TOKEN_TTL=3600)
+    def test_expired_tokens_are_refused(self):
+        key = self.login()
+        self.age(3601)
+
+        response = self.get_details(key)
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()["detail"], "Token has expired.")
+
+    @override_settings(API_TOKEN_ROTATE_AFTER=600)
+    def test_logins_reuse_a_recent_token_and_rotate_an_older_one(self):
+        first = self.login()
+        self.assertEqual(self.login(), first)
+
+        self.age(601)
+        second = self.login()
+
+        self.assertNotEqual(second, first)
+        self.assertEqual(self.get_details(first).status_code, 401)
+        self.assertEqual(self.get_details(second).status_code, 200)
+
+    def test_refresh_swaps_the_token(self):
+        key = self.login()
+
+        response = self.client.post(reverse("api_token_refresh"), HTTP_AUTHORIZATION=f"Token {key}")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_details(key).status_code, 401)
+        self.assertEqual(self.get_details(response.json()["token"]).status_code, 200)
+
+    def test_logout_revokes_the_token(self):
+        key = self.login()
+
+        self.client.post(reverse("api_logout"), HTTP_AUTHORIZATION=f"Token {key}")
+
+        self.assertEqual(self.get_details(key).status_code, 401)
+
+    def test_tokens_of_inactive_users_are_refused(self):
+        key = self.login()
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        self.assertEqual(self.get_details(key).status_code, 401)
+
+
+class SharedCacheTokenTests(TokenTests):
+    """The same with a cache shared between processes, where token lookups are cached."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        shared = override_settings(CACHES={
+            **settings.CACHES,
+            "default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": directory.name},
+        })
+        shared.enable()
+        self.addCleanup(shared.disable)
+        super().setUp()
+
+    def test_revocation_beats_the_cached_token(self):
+        self.assertIsNotNone(token_cache())
+        token = issue_token(self.user)
+        # Cached by this lookup
+        self.assertEqual(self.get_details(token.key).status_code, 200)
+
+        revoke_token(token)
+
+        self.assertEqual(self.get_details(token.key).status_code, 401)
+
+
+def png(width, height):
+    image = io.BytesIO()
+    Image.new("1", (width, height)).save(image, "PNG")
+    return image.getvalue()
+
+
+class ImageSerializer(serializers.Serializer):
+    cover_photo = ValidatedImageField()
+
+
+@override_settings(UPLOAD_SIZE_LIMITS={"cover_photo": 2048})
+class UploadTests(TestCase):
+    """Forms and serializers say why ImageUploadHandler refused a file."""
+
+    REFUSED = [
+        (b"GIF89a" + bytes(100), "The uploaded file is not a PNG or JPEG image."),
+        (png(10, 10) + bytes(4096), "The uploaded file is too large. Maximum size is 2.0\xa0KB."),
+        (png(7000, 1), "Image is 7000x1 pixels, the maximum is 6000x6000."),
+    ]
+
+    def upload(self, content):
+        # Parsed by the FILE_UPLOAD_HANDLERS, as in a real request
+        request = RequestFactory().post("/", {"cover_photo": SimpleUploadedFile("cover.png", content)})
+        return request.FILES
+
+    def errors(self, files):
+        serializer = ImageSerializer(data=files)
+        serializer.is_valid()
+        return {
+            "form": UserProfileForm(files=files).errors["cover_photo"],
+            # The admin's, from the model field
+            "model form": modelform_factory(UserProfile, fields=["cover_photo"])(files=files).errors["cover_photo"],
+            "serializer": serializer.errors["cover_photo"],
+        }
+
+    def test_refused_uploads(self):
+        for content, message in self.REFUSED:
+            for source, errors in self.errors(self.upload(content)).items():
+                with self.subTest(source=source, message=message):
+                    self.assertEqual([str(error) for error in errors], [message])
+
+    def test_accepted_upload(self):
+        files = self.upload(png(10, 10))
+
+        self.assertNotIn("cover_photo", modelform_factory(UserProfile, fields=["cover_photo"])(files=files).errors)
+        self.assertTrue(ImageSerializer(data=files).is_valid())
@@ -0,0 +1,89 @@
+import io
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from PIL import ImageFile
+
+from .validators import get_upload_size_limit, sniff_image_type
+
+# Stop looking for the image dimensions after this many bytes
+DIMENSIONS_PROBE_SIZE = 256 * 2**10
+
+
+class RejectedUpload(UploadedFile):
+    """Placeholder for a file refused while streaming, reported by allow_only_images_validator."""
+
+    def __init__(self, name, size, upload_error):
+        super().__init__(io.BytesIO(), name=name, size=size)
+        self.upload_error = upload_error
+
+
+class ImageUploadHandler(FileUploadHandler):
+    """
+    Checks image uploads while they stream in, before the following handlers
+    buffer them in memory or on disk.
+
+    The first chunk must start with PNG or JPEG magic bytes and the image
+    dimensions are read from the header. Uploads larger than the limit of their
+    field (UPLOAD_SIZE_LIMITS) are cut off as soon as the limit is crossed.
+    Accepted chunks are passed on unchanged to the next handler.
+    """
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.size_limit = get_upload_size_limit(field_name)
+        self.upload_error = None
+        self.parser = ImageFile.Parser()
+        self.received = 0
+
+    def reject(self, message):
+        self.upload_error = message
+        self.parser = None
+
+    def check_dimensions(self, raw_data):
+        self.parser.feed(raw_data)
+        if self.parser.image is None:
+            if self.received >= DIMENSIONS_PROBE_SIZE:
+                self.parser = None
+            return
+        width, height = self.parser.image.size
+        max_dimension = settings.UPLOAD_MAX_IMAGE_DIMENSION
+        if width > max_dimension or height > max_dimension:
+            self.reject(
+                f"Image is {width}x{height} pixels, the maximum is {max_dimension}x{max_dimension}."
+            )
+        else:
+            self.parser = None
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.upload_error:
+            return None
+
+        if start == 0 and sniff_image_type(raw_data) is None:
+            self.reject("The uploaded file is not a PNG or JPEG image.")
+            return None
+
+        self.received += len(raw_data)
+        if self.received > self.size_limit:
+            self.reject(
+                "The uploaded file is too large. Maximum size is %s."
+                % filesizeformat(self.size_limit)
+            )
+            return None
+
+        if self.parser is not None:
+            try:
+                self.check_dimensions(raw_data)
+            except Exception:
+                self.reject("The uploaded file is not a valid image.")
+            if self.upload_error:
+                return None
+
+        return raw_data
+
+    def file_complete(self, file_size):
+        if self.upload_error:
+            return RejectedUpload(self.file_name, max(self.received, 1), self.upload_error)
+        return None
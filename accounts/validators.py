@@ -1,13 +1,46 @@
 import os
 
+from django.conf import settings
 from django.core.exceptions import ValidationError
 
+# Leading bytes of every image format we accept
+IMAGE_SIGNATURES = {
+    b"\xff\xd8\xff": "jpeg",
+    b"\x89PNG\r\n\x1a\n": "png",
+}
+
+
+def sniff_image_type(header):
+    for signature, image_type in IMAGE_SIGNATURES.items():
+        if header.startswith(signature):
+            return image_type
+    return None
+
+
+def get_upload_size_limit(field_name):
+    return settings.UPLOAD_SIZE_LIMITS.get(field_name, settings.UPLOAD_DEFAULT_SIZE_LIMIT)
+
+
+def check_upload_error(value):
+    """Report why accounts.upload_handlers.ImageUploadHandler refused the file while it streamed in."""
+    upload_error = getattr(value, "upload_error", None)
+    if upload_error:
+        raise ValidationError(upload_error, code="upload_error")
+
 
 def allow_only_images_validator(value):
+    check_upload_error(value)
+
     ext = os.path.splitext(value.name)[1]  # cover-image.jpg
-    print(ext)
     valid_extensions = [".png", ".jpg", ".jpeg"]
     if not ext.lower() in valid_extensions:
         raise ValidationError(
             "Unsupported file extension. Allowed extensions: " + str(valid_extensions)
         )
+
+    # Cheap even for large files: only the first bytes are read
+    value.seek(0)
+    header = value.read(16)
+    value.seek(0)
+    if sniff_image_type(header) is None:
+        raise ValidationError("The uploaded file is not a PNG or JPEG image.")
@@ -7,6 +7,7 @@ from django.shortcuts import redirect, render
 from django.template.defaultfilters import slugify
 from django.utils.http import urlsafe_base64_decode
 
+from foodOnline_main.throttling import post_field_identity, throttle
 from vendor.forms import VendorForm
 from vendor.models import Vendor
 
@@ -22,6 +23,10 @@ from django.views.generic import FormView
 from .forms import PasswordChangeForm
 from orders.models import Order
 
+# Number of orders listed on the customer dashboard, the rest are in My Orders
+RECENT_ORDERS_COUNT = 5
+
+
 # Restrict the vendor from accessing the customer page
 def check_role_vendor(user):
     if user.role == 1:
@@ -162,6 +167,8 @@ def activate(request, uidb64, token):
         return redirect("myAccount")
 
 
+# Limit POSTs before authenticate() spends CPU on the password hash
+@throttle("login", keys=("ip", post_field_identity("email")), methods=("POST",))
 def login(request):
     if request.user.is_authenticated:
         messages.warning(request, "You are already logged in!")
@@ -170,11 +177,9 @@ def login(request):
         email = request.POST["email"]
         password = request.POST["password"]
 
-        print(email, password)
         user = auth.authenticate(email=email, password=password)
 
         if user is not None:
-            print("user is none")
             auth.login(request, user)
             messages.success(request, "You are now logged in.")
             return redirect("home")
@@ -200,9 +205,10 @@ def myAccount(request):
 @login_required(login_url="login")
 @user_passes_test(check_role_customer)
 def custDashboard(request):
-    recent_orders = Order.objects.filter(user=request.user, is_ordered=True).order_by('-created_at')
+    orders = Order.objects.filter(user=request.user, is_ordered=True)
     context = {
-        'recent_orders' : recent_orders,
+        'recent_orders' : orders.order_by('-created_at', '-id')[:RECENT_ORDERS_COUNT],
+        'orders_count': orders.count(),
     }
     return render(request, "accounts/custDashboard.html", context)
 
@@ -213,6 +219,7 @@ def vendorDashboard(request):
     return render(request, "accounts/vendorDashboard.html")
 
 
+@throttle("password_reset", keys=("ip", post_field_identity("email")), methods=("POST",))
 def forgot_password(request):
     if request.method == "POST":
         email = request.POST["email"]
@@ -258,8 +265,12 @@ def reset_password(request):
         confirm_password = request.POST["confirm_password"]
 
         if password == confirm_password:
-            pk = request.session.get("uid")
-            user = User.objects.get(pk=pk)
+            # One reset per validated link, don't leave the uid behind in the session
+            pk = request.session.pop("uid", None)
+            user = User.objects.filter(pk=pk).first() if pk else None
+            if user is None:
+                messages.error(request, "This link has been expired!")
+                return redirect("forgot_password")
             user.set_password(password)
             user.is_active = True
             user.save()
@@ -1,5 +1,8 @@
+from django.conf import settings
 from django.urls import path
 from accounts import views as AccountViews
+from orders import async_views as OrderAsyncViews
+from vendor import api_views as VendorApiViews
 from . import views
 
 
@@ -9,10 +12,13 @@ urlpatterns = [
     path('my-orders/', views.MyOrdersView.as_view(), name='my_orders'),
     path('order/<int:pk>/', views.OrderDetailView.as_view(), name='order_detail'),
     path('vendor/orders/', views.VendorOrdersView.as_view(), name='vendor_orders'),
+    path('vendor/orders/status/', views.VendorOrderStatusView.as_view(), name='vendor_order_status'),
+    path('vendor/orders/changes/', VendorApiViews.VendorOrderChangesAPIView.as_view(), name='vendor_order_changes'),
+    path('vendor/orders/status/json/', VendorApiViews.VendorOrderStatusAPIView.as_view(), name='vendor_order_status_json'),
     path('vendor/orders/<int:pk>/', views.VendorOrderDetailView.as_view(), name='vendor_order_detail'),
+    path('vendor/orders/<int:pk>/json/', VendorApiViews.VendorOrderDetailAPIView.as_view(), name='vendor_order_detail_json'),
 ]
 
-
-
-
-
+# Long-lived streams, only served by an ASGI server
+if settings.ASYNC_ORDER_EVENTS:
+    urlpatterns.append(path('vendor/orders/events/', OrderAsyncViews.vendor_order_events, name='vendor_order_events'))
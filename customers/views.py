@@ -1,4 +1,5 @@
-from django.db.models.query import QuerySet
+from django.conf import settings
+from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404
 from django.views.generic import UpdateView
 from django.contrib.auth.mixins import LoginRequiredMixin
@@ -7,7 +8,10 @@ from django.contrib import messages
 from accounts.forms import UserInfoForm, UserProfileForm
 from accounts.models import UserProfile
 from orders.models import Order, OrderedFood
-from django.views.generic import ListView, DetailView
+from orders.pagination import keyset_paginate
+from django.views.generic import ListView, DetailView, View
+from django.shortcuts import redirect
+from orders.lifecycle import InvalidTransition, transition_orders
 
 
 class CProfileView(LoginRequiredMixin, UpdateView):
@@ -40,23 +44,39 @@ class CProfileView(LoginRequiredMixin, UpdateView):
         return self.render_to_response(context)
 
 
-class MyOrdersView(ListView):
+class MyOrdersView(LoginRequiredMixin, ListView):
     model = Order
     template_name = 'customers/my_orders.html'  
     context_object_name = 'orders'  # The context variable to use in the template
+    login_url = 'login'
+    paginate_by = 20
 
     def get_queryset(self):
         # Filter the orders for the current user and only those that are ordered
-        return Order.objects.filter(user=self.request.user, is_ordered=True).order_by('-created_at')
+        return Order.objects.filter(user=self.request.user, is_ordered=True)
+
+    def paginate_queryset(self, queryset, page_size):
+        # Keyset pagination on created_at, ?after=<cursor> continues after the last order shown
+        page = keyset_paginate(queryset, self.request.GET.get('after'), page_size)
+        return None, page, page.object_list, page.has_next
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['next_cursor'] = context['page_obj'].next_cursor
+        context['is_first_page'] = 'after' not in self.request.GET
+        return context
     
 
-class OrderDetailView(DetailView):
+class OrderDetailView(LoginRequiredMixin, DetailView):
     model = Order
     template_name = 'customers/order_detail.html'  
     context_object_name = 'order'  
+    login_url = 'login'
 
     def get_queryset(self):
-        return Order.objects.filter(user=self.request.user)
+        return Order.objects.filter(user=self.request.user).prefetch_related(
+            Prefetch('orderedfood_set', queryset=OrderedFood.objects.select_related('fooditem').order_by('id'))
+        )
 
 
 class VendorOrdersView(LoginRequiredMixin, ListView):
@@ -66,14 +86,14 @@ class VendorOrdersView(LoginRequiredMixin, ListView):
     login_url = 'login'
 
     def get_queryset(self):
-        # Fetch the current vendor
-        current_vendor = self.request.user.user  # Assuming the user has a OneToOne relationship with Vendor
-        return Order.objects.filter(vendor=current_vendor).order_by('-created_at')
+        # The orders the vendor owns and may change, the ones its event stream pushes (orders.events)
+        return Order.objects.owned_by_vendor_user(self.request.user).filter(is_ordered=True).order_by('-created_at')
 
     def get_context_data(self, **kwargs):
         # Add vendor information to the context
         context = super().get_context_data(**kwargs)
         context['vendor'] = self.request.user.user  # Assuming user has OneToOne relation with Vendor
+        context['order_events'] = settings.ASYNC_ORDER_EVENTS
         return context
     
 
@@ -84,10 +104,36 @@ class VendorOrderDetailView(LoginRequiredMixin, DetailView):
     login_url = 'login'
 
     def get_queryset(self):
-        current_vendor = self.request.user.user
-        return Order.objects.filter(vendor=current_vendor)
+        # One query for the order and its customer, one for this vendor's lines with their food items
+        user = self.request.user
+        return Order.objects.for_vendor_user(user).with_vendor_lines(user).select_related('user')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['ordered_food_items'] = OrderedFood.objects.filter(order=self.object)
-        return context
\ No newline at end of file
+        lines = self.object.vendor_lines
+        context['ordered_food_items'] = lines
+        context['vendor_totals'] = self.object.totals_for_vendor(lines[0].vendor_id) if lines else None
+        return context
+
+
+class VendorOrderStatusView(LoginRequiredMixin, View):
+    """Move one or many of the vendor's orders (``order_ids``) to ``status`` in a single UPDATE."""
+    login_url = 'login'
+
+    def post(self, request, *args, **kwargs):
+        order_ids = [pk for pk in request.POST.getlist('order_ids') if pk.isdigit()]
+        status = request.POST.get('status')
+        orders = Order.objects.owned_by_vendor_user(request.user).filter(pk__in=order_ids, is_ordered=True)
+        try:
+            moved, skipped = transition_orders(orders, status, request.user)
+        except InvalidTransition as e:
+            messages.error(request, str(e))
+        else:
+            if moved:
+                messages.success(request, f'{len(moved)} order(s) marked as {status}.')
+            if skipped:
+                messages.warning(request, f'{len(skipped)} order(s) can\'t be marked as {status}.')
+
+        if len(order_ids) == 1:
+            return redirect('vendor_order_detail', pk=order_ids[0])
+        return redirect('vendor_orders')
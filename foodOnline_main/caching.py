@@ -0,0 +1,181 @@
+import math
+import random
+import time
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from .routers import primary_reads
+
+TAGS_CACHE = "default"
+LOCK_TIMEOUT = 10
+# How long a caller without a previous value waits for the lock holder before computing it too
+LOCK_MAX_WAIT = 1.0
+LOCK_WAIT = 0.05
+
+
+def make_key(*parts):
+    """Build a cache key like ``vendor:12:menu`` from the given parts."""
+    return ":".join(str(part) for part in parts)
+
+
+def _tag_key(tag):
+    return make_key("tag", tag)
+
+
+def new_tag_version():
+    # Never a version the tag had before it was evicted, or entries stored under it would be valid again
+    return time.time_ns()
+
+
+def get_tag_versions(tags):
+    """Return the current version of every tag, creating missing ones."""
+    if not tags:
+        return {}
+    cache = caches[TAGS_CACHE]
+    keys = {_tag_key(tag): tag for tag in tags}
+    found = cache.get_many(keys.keys())
+    missing = [key for key in keys if key not in found]
+    if missing:
+        for key in missing:
+            cache.add(key, new_tag_version(), None)
+        # Whoever created a tag first decides its version
+        found.update(cache.get_many(missing))
+    return {keys[key]: version for key, version in found.items()}
+
+
+def invalidate_tags(*tags):
+    """Bump the version of the given tags so every entry stored under them goes stale."""
+    cache = caches[TAGS_CACHE]
+    for tag in tags:
+        key = _tag_key(tag)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, new_tag_version(), None)
+
+
+def cached(key, producer, timeout=None, cache_alias="default", tags=(), version=None):
+    """
+    Return the cached value for ``key``, calling ``producer`` on a miss.
+
+    Entries are dropped when one of their ``tags`` is invalidated. To avoid a
+    stampede on popular keys, the value is recomputed a little before it expires
+    (probabilistic early expiration) and only one caller at a time holds the
+    recompute lock; the others keep serving the previous value.
+
+    ``timeout`` may also be a callable, given the computed value and returning
+    its timeout, for values that go stale at a known time.
+
+    ``producer`` reads from the primary database: a lagging replica would put
+    data older than the tag invalidation back into the cache for the whole
+    timeout.
+    """
+    cache = caches[cache_alias]
+    if timeout is None:
+        timeout = cache.default_timeout
+    tag_versions = get_tag_versions(tags)
+
+    stale = None
+    entry = cache.get(key, version=version)
+    if entry is not None:
+        value, entry_tags, delta, expires_at = entry
+        if entry_tags == tag_versions:
+            beta = settings.CACHE_EARLY_RECOMPUTE_BETA
+            if time.time() - delta * beta * math.log(random.random()) < expires_at:
+                return value
+            stale = entry
+
+    lock_key = make_key("lock", key)
+    token = uuid.uuid4().hex
+    if not cache.add(lock_key, token, LOCK_TIMEOUT, version=version):
+        if stale is not None:
+            return stale[0]
+        # Someone else is computing the value, give them a moment before doing it ourselves.
+        token = None
+        deadline = time.time() + LOCK_MAX_WAIT
+        while time.time() < deadline:
+            time.sleep(LOCK_WAIT)
+            entry = cache.get(key, version=version)
+            if entry is not None and entry[1] == tag_versions:
+                return entry[0]
+            candidate = uuid.uuid4().hex
+            if cache.add(lock_key, candidate, LOCK_TIMEOUT, version=version):
+                token = candidate
+                break
+
+    try:
+        start = time.time()
+        with primary_reads():
+            value = producer()
+            delta = time.time() - start
+            if callable(timeout):
+                timeout = timeout(value)
+        cache.set(key, (value, tag_versions, delta, time.time() + timeout), timeout, version=version)
+    finally:
+        # Only our own lock: it may have expired and been taken by someone else meanwhile
+        if token is not None and cache.get(lock_key, version=version) == token:
+            cache.delete(lock_key, version=version)
+    return value
+
+
+class UncacheablePage(Exception):
+    """Carries a response cache_page_for_anonymous must not store, out of cached()."""
+
+    def __init__(self, response):
+        self.response = response
+
+
+def cache_page_for_anonymous(timeout, cache_alias="default", tags=()):
+    """
+    Full-page cache for visitors without a session or pending messages.
+
+    Everyone else gets the view rendered as usual, and so does everyone when
+    the view answers anything but a plain 200 (redirects, errors, responses
+    setting cookies). Cached responses keep their headers. Responses always
+    carry ``Vary: Cookie`` so that shared caches never serve the anonymous
+    page to a logged in user.
+    """
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            anonymous = (
+                request.method in ("GET", "HEAD")
+                and settings.SESSION_COOKIE_NAME not in request.COOKIES
+                and "messages" not in request.COOKIES
+            )
+            if not anonymous:
+                response = view_func(request, *args, **kwargs)
+                patch_vary_headers(response, ("Cookie",))
+                return response
+
+            def render_page():
+                response = view_func(request, *args, **kwargs)
+                if callable(getattr(response, "render", None)):
+                    response.render()
+                if response.status_code != 200 or response.streaming or response.cookies:
+                    raise UncacheablePage(response)
+                return response
+
+            try:
+                response = cached(
+                    make_key("page", request.path, request.GET.urlencode()),
+                    render_page,
+                    timeout=timeout,
+                    cache_alias=cache_alias,
+                    tags=tags,
+                )
+            except UncacheablePage as e:
+                response = e.response
+            else:
+                patch_cache_control(response, max_age=timeout)
+            patch_vary_headers(response, ("Cookie",))
+            return response
+
+        return _wrapped_view
+
+    return decorator
@@ -0,0 +1,81 @@
+import threading
+
+import psycopg2.extras
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+from psycopg2 import pool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class BlockingConnectionPool(pool.ThreadedConnectionPool):
+    """
+    ThreadedConnectionPool that waits up to ``timeout`` seconds for a
+    connection to come back when all of them are out, instead of failing
+    right away.
+    """
+
+    def __init__(self, minconn, maxconn, *args, timeout=30, **kwargs):
+        self.timeout = timeout
+        self._available = threading.BoundedSemaphore(maxconn)
+        super().__init__(minconn, maxconn, *args, **kwargs)
+
+    def getconn(self, key=None):
+        if not self._available.acquire(timeout=self.timeout):
+            raise pool.PoolError(f"no connection available after {self.timeout}s")
+        try:
+            return super().getconn(key)
+        except Exception:
+            self._available.release()
+            raise
+
+    def putconn(self, conn=None, key=None, close=False):
+        super().putconn(conn, key, close)
+        self._available.release()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    PostgreSQL backend that borrows connections from an in-process pool.
+
+    Meant for ASGI deployments where Django's persistent connections are not
+    reused across requests. Set CONN_MAX_AGE to 0 so that every request hands
+    its connection back to the pool instead of closing the socket. Requests
+    beyond ``pool_max_size`` wait up to ``pool_timeout`` seconds for one.
+    Needs psycopg2.
+    """
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        self.pool_min_size = conn_params.pop("pool_min_size", 1)
+        self.pool_max_size = conn_params.pop("pool_max_size", 10)
+        self.pool_timeout = conn_params.pop("pool_timeout", 30)
+        return conn_params
+
+    def get_pool(self, conn_params):
+        with _pools_lock:
+            if self.alias not in _pools:
+                _pools[self.alias] = BlockingConnectionPool(
+                    self.pool_min_size, self.pool_max_size, timeout=self.pool_timeout, **conn_params
+                )
+            return _pools[self.alias]
+
+    def get_new_connection(self, conn_params):
+        options = self.settings_dict["OPTIONS"]
+        self.isolation_level = IsolationLevel(
+            options.get("isolation_level", IsolationLevel.READ_COMMITTED)
+        )
+        connection = self.get_pool(conn_params).getconn()
+        connection.isolation_level = self.isolation_level
+        psycopg2.extras.register_default_jsonb(
+            conn_or_curs=connection, loads=lambda x: x
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                _pools[self.alias].putconn(
+                    self.connection, close=bool(self.connection.closed)
+                )
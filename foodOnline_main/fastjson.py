@@ -0,0 +1,91 @@
+import datetime
+import json
+import uuid
+from decimal import Decimal
+
+from django.http import HttpResponse, JsonResponse
+from django.utils.functional import Promise
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the standard library does the same work slower
+    orjson = None
+
+
+def default(o):
+    """Values neither encoder knows: Decimals as exact strings, lazy strings, querysets and other iterables."""
+    if isinstance(o, Decimal):
+        return str(o)
+    if isinstance(o, Promise):
+        return str(o)
+    if hasattr(o, "__iter__"):
+        return list(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class Encoder(json.JSONEncoder):
+    """The fallback encoder, writing dates and times like orjson and DRF do."""
+
+    def default(self, o):
+        # Amounts are the most common non-json values of this project's payloads
+        if isinstance(o, Decimal):
+            return str(o)
+        if isinstance(o, datetime.datetime):
+            representation = o.isoformat()
+            return representation[:-6] + "Z" if representation.endswith("+00:00") else representation
+        if isinstance(o, (datetime.date, datetime.time)):
+            return o.isoformat()
+        if isinstance(o, uuid.UUID):
+            return str(o)
+        return default(o)
+
+
+if orjson is not None:
+    OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def dumps(value):
+        """``value`` as compact UTF-8 json bytes."""
+        return orjson.dumps(value, default=default, option=OPTIONS)
+
+    loads = orjson.loads
+
+else:
+    _encoder = Encoder(separators=(",", ":"), ensure_ascii=False)
+
+    def dumps(value):
+        """``value`` as compact UTF-8 json bytes."""
+        return _encoder.encode(value).encode()
+
+    loads = json.loads
+
+
+class FastJSONRenderer(JSONRenderer):
+    """DRF's JSONRenderer through :func:`dumps`, except for indented output which is left to DRF."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+class FastJSONParser(JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return loads(stream.read())
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+
+class FastJsonResponse(JsonResponse):
+    """JsonResponse encoding with :func:`dumps`, Decimals included."""
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError("In order to allow non-dict objects to be serialized set the safe parameter to False.")
+        kwargs.setdefault("content_type", "application/json")
+        HttpResponse.__init__(self, content=dumps(data), **kwargs)
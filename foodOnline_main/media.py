@@ -0,0 +1,128 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+
+from .storage import check_media_signature, media_needs_signature
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_range(header, size):
+    """Return ``(start, end)`` of a single byte range, ``None`` to send the whole file, or ``False`` if unsatisfiable."""
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        # Multiple ranges or garbage, RFC 9110 lets us answer with the full file
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        if last and int(last) < start:
+            # Invalid, not unsatisfiable: RFC 9110 says to ignore it
+            return None
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # Suffix range, the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+    if start > end or start >= size:
+        return False
+    return start, end
+
+
+def read_range(path, start, length):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def serve_media(request, path):
+    """
+    Serve an uploaded file from ``MEDIA_ROOT``.
+
+    With ``MEDIA_SERVER`` set to "nginx" or "apache" only the headers are
+    built here and the web server sends the bytes (``X-Accel-Redirect`` /
+    ``X-Sendfile``). Otherwise the file is streamed with ETag, Last-Modified
+    and single range support.
+    """
+    signed = media_needs_signature(path)
+    if signed and not check_media_signature(path, request.GET.get("expires"), request.GET.get("signature")):
+        raise Http404("Invalid or expired media url.")
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404("Invalid media path.")
+    if not os.path.isfile(fullpath):
+        raise Http404("Media file does not exist.")
+
+    stat = os.stat(fullpath)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        response = build_response(request, path, fullpath, stat.st_size, etag, int(stat.st_mtime))
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    if signed:
+        patch_cache_control(response, private=True, max_age=settings.MEDIA_URL_EXPIRE)
+    else:
+        patch_cache_control(response, public=True, max_age=settings.MEDIA_CACHE_MAX_AGE)
+    return response
+
+
+def build_response(request, path, fullpath, size, etag, last_modified):
+    content_type, encoding = mimetypes.guess_type(fullpath)
+    content_type = content_type or "application/octet-stream"
+
+    if settings.MEDIA_SERVER == "nginx":
+        # nginx handles ranges and conditional requests on the internal location itself
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_PREFIX + quote(path)
+        return response
+    if settings.MEDIA_SERVER == "apache":
+        response = HttpResponse(content_type=content_type)
+        response["X-Sendfile"] = fullpath
+        return response
+
+    byte_range = None
+    range_header = request.headers.get("Range")
+    if range_header and request.method == "GET" and if_range_matches(request, etag, last_modified):
+        byte_range = parse_range(range_header, size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+    elif byte_range is None:
+        response = FileResponse(open(fullpath, "rb"), content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            read_range(fullpath, start, end - start + 1), status=206, content_type=content_type
+        )
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = end - start + 1
+    if encoding:
+        response["Content-Encoding"] = encoding
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+def if_range_matches(request, etag, last_modified):
+    """A Range is only honoured when the client's copy, named by If-Range, is still current."""
+    if_range = request.headers.get("If-Range")
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/"')):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
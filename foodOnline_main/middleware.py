@@ -0,0 +1,121 @@
+import mimetypes
+import os
+from functools import cached_property
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+
+from .routers import PIN_COOKIE, request_state
+
+# Preferred encoding first
+STATIC_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def accepted_encodings(header):
+    """Content codings an ``Accept-Encoding`` header allows, those with ``q=0`` left out."""
+    accepted, refused = set(), set()
+    for item in header.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        (accepted if quality > 0 else refused).add(coding.lower())
+    if "*" in accepted:
+        accepted.update(encoding for encoding, _ in STATIC_ENCODINGS if encoding not in refused)
+    return accepted
+
+
+class StaticFilesMiddleware:
+    """
+    Serve ``STATIC_ROOT`` when running without a web server in front of the app.
+
+    Picks the precompressed ``.br``/``.gz`` variant written by collectstatic
+    when the client accepts it. Hashed file names never change content, so
+    they are cached for a year; other files are revalidated.
+    """
+
+    def __init__(self, get_response):
+        if settings.DEBUG or not settings.STATIC_ROOT:
+            # runserver serves the app's static files itself in development
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = "/" + settings.STATIC_URL.lstrip("/")
+
+    @cached_property
+    def hashed_names(self):
+        return set(getattr(staticfiles_storage, "hashed_files", {}).values())
+
+    def __call__(self, request):
+        if request.method in ("GET", "HEAD") and request.path_info.startswith(self.prefix):
+            response = self.serve(request, request.path_info[len(self.prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def find_variant(self, request, path):
+        accepted = accepted_encodings(request.headers.get("Accept-Encoding", ""))
+        for encoding, extension in STATIC_ENCODINGS:
+            if encoding in accepted and os.path.isfile(path + extension):
+                return path + extension, encoding
+        return path, None
+
+    def serve(self, request, name):
+        try:
+            path = safe_join(settings.STATIC_ROOT, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        variant, encoding = self.find_variant(request, path)
+        stat = os.stat(variant)
+        last_modified = http_date(stat.st_mtime)
+        if request.headers.get("If-Modified-Since") == last_modified:
+            response = HttpResponseNotModified()
+        else:
+            content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            response = FileResponse(open(variant, "rb"), content_type=content_type)
+            response["Content-Length"] = stat.st_size
+            if encoding:
+                response["Content-Encoding"] = encoding
+        response["Last-Modified"] = last_modified
+        if name in self.hashed_names:
+            response["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        else:
+            response["Cache-Control"] = "public, max-age=0, must-revalidate"
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return response
+
+
+class ReplicaPinMiddleware:
+    """
+    Keep clients on the primary for ``REPLICA_PIN_SECONDS`` after they wrote,
+    so they read their own writes while the replicas catch up.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with request_state(pinned=PIN_COOKIE in request.COOKIES) as state:
+            response = self.get_response(request)
+        if state.wrote:
+            response.set_cookie(
+                PIN_COOKIE, "1", max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite="Lax"
+            )
+        return response
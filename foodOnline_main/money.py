@@ -0,0 +1,95 @@
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from django import forms
+from django.core import exceptions
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models.lookups import GreaterThanOrEqual, LessThan
+
+CENT = Decimal("0.01")
+
+
+def to_cents(value):
+    """Integer cents of an amount given as Decimal, str, int or float, rounded half up."""
+    if isinstance(value, float):
+        # repr() is the shortest string giving back the float, 0.1 stays 0.1
+        value = repr(value)
+    return int((Decimal(value) * 100).quantize(Decimal(1), ROUND_HALF_UP))
+
+
+def from_cents(cents):
+    """``1250`` -> ``Decimal("12.50")``."""
+    return Decimal(cents).scaleb(-2)
+
+
+def percent_of(cents, percentage):
+    """``percentage`` percent of ``cents``, rounded half up to a whole cent."""
+    return int((cents * Decimal(str(percentage)) / 100).quantize(Decimal(1), ROUND_HALF_UP))
+
+
+def compute_totals(lines, rates):
+    """
+    Subtotal, taxes and total of ``lines``, ``(unit price, quantity)`` pairs,
+    for ``rates``, ``(tax_type, percentage)`` pairs, all in integer cents.
+
+    Lines are added up exactly and every tax is rounded once, on the subtotal,
+    so the result doesn't depend on the number or order of the lines.
+    Returns ``(subtotal, {tax_type: {percentage: tax}}, tax, total)``.
+    """
+    subtotal = sum(to_cents(price) * quantity for price, quantity in lines)
+    taxes = {tax_type: {str(percentage): percent_of(subtotal, percentage)} for tax_type, percentage in rates}
+    tax = sum(amount for amounts in taxes.values() for amount in amounts.values())
+    return subtotal, taxes, tax, subtotal + tax
+
+
+class MoneyJSONEncoder(DjangoJSONEncoder):
+    """
+    Encodes Decimal amounts as exact two-place strings ("12.50"). Amounts are
+    the only non-JSON values in order data, so they are checked first, before
+    DjangoJSONEncoder's chain of date and time checks.
+    """
+
+    def default(self, o):
+        if isinstance(o, Decimal):
+            return f"{o:.2f}"
+        return super().default(o)
+
+
+class MoneyField(models.BigIntegerField):
+    """
+    An amount stored as an integer number of cents, so sums and comparisons
+    in SQL are exact, and used as a two-place Decimal in Python.
+    """
+
+    description = "Amount of money, stored in cents"
+
+    def from_db_value(self, value, expression, connection):
+        return None if value is None else from_cents(value)
+
+    def to_python(self, value):
+        if value is None or isinstance(value, Decimal):
+            return value
+        try:
+            return from_cents(to_cents(value))
+        except (InvalidOperation, TypeError, ValueError):
+            raise exceptions.ValidationError(
+                self.error_messages["invalid"], code="invalid", params={"value": value}
+            )
+
+    def get_prep_value(self, value):
+        # Skip IntegerField's int() of the amount
+        value = models.Field.get_prep_value(self, value)
+        if value is None:
+            return None
+        try:
+            return to_cents(value)
+        except (InvalidOperation, TypeError, ValueError) as e:
+            raise e.__class__(f"Field '{self.name}' expected an amount but got {value!r}.") from e
+
+    def formfield(self, **kwargs):
+        return super().formfield(**{"form_class": forms.DecimalField, "decimal_places": 2, **kwargs})
+
+
+# IntegerField rounds float bounds of these lookups up to whole numbers, which would be whole units here
+MoneyField.register_lookup(GreaterThanOrEqual)
+MoneyField.register_lookup(LessThan)
@@ -0,0 +1,100 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+PIN_COOKIE = "pin_primary"
+
+# Replica reads are opted into per view, the rest of the code always sees the primary
+_replica = ContextVar("replica", default=None)
+_request_state = ContextVar("replica_request_state", default=None)
+
+
+class RequestState:
+    __slots__ = ("pinned", "wrote")
+
+    def __init__(self, pinned):
+        self.pinned = pinned
+        self.wrote = False
+
+
+@contextmanager
+def request_state(pinned):
+    """Track the writes of one request, whose client is ``pinned`` to the primary or not."""
+    state = RequestState(pinned)
+    token = _request_state.set(state)
+    try:
+        yield state
+    finally:
+        _request_state.reset(token)
+
+
+@contextmanager
+def replica_reads():
+    """Send the reads of the block to one replica, unless the client is pinned to the primary."""
+    state = _request_state.get()
+    replicas = settings.DATABASE_REPLICAS
+    alias = random.choice(replicas) if replicas and not (state and state.pinned) else None
+    token = _replica.set(alias)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Read from the primary inside the block, e.g. to fill a shared cache with fresh data."""
+    token = _replica.set(None)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+def use_replica(view_func):
+    """Run a read-only browse view with :func:`replica_reads`."""
+
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        with replica_reads():
+            response = view_func(request, *args, **kwargs)
+            # Lazy template responses query while rendering
+            if hasattr(response, "render") and not response.is_rendered:
+                response.render()
+            return response
+
+    return _wrapped_view
+
+
+class ReplicaRouter:
+    """
+    Reads go to the replica chosen by :func:`replica_reads`, everything else
+    and every write to ``default``. Replicas are never migrated, they get
+    their schema and data from the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == "sessions":
+            # A session written a moment ago must be found on the next request
+            return "default"
+        return _replica.get() or "default"
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state.wrote = True
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {"default", *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,46 @@
+from django.contrib.sessions.backends import cached_db
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+
+
+class SessionStore(cached_db.SessionStore):
+    """
+    ``cached_db`` sessions that keep the signed, compressed session string in
+    the cache instead of a pickled dict, and skip the database and cache
+    writes when a modified session ends up with the data it was loaded with.
+    """
+
+    cache_key_prefix = "foodonline.sessions"
+
+    def __init__(self, session_key=None):
+        self._loaded_payload = None
+        super().__init__(session_key)
+
+    def _payload(self, data):
+        return self.serializer().dumps(data)
+
+    def load(self):
+        try:
+            session_data = self._cache.get(self.cache_key)
+        except Exception:
+            # Some backends (e.g. memcache) raise an exception on invalid cache keys
+            session_data = None
+
+        if session_data is None:
+            s = self._get_session_from_db()
+            if not s:
+                return {}
+            session_data = s.session_data
+            self._cache.set(self.cache_key, session_data, self.get_expiry_age(expiry=s.expire_date))
+
+        data = self.decode(session_data)
+        self._loaded_payload = self._payload(data)
+        return data
+
+    def save(self, must_create=False):
+        data = self._get_session(no_load=must_create)
+        payload = self._payload(data)
+        if not must_create and self.session_key and payload == self._loaded_payload:
+            return
+        DBStore.save(self, must_create)
+        self._cache.set(self.cache_key, self.encode(data), self.get_expiry_age())
+        self._loaded_payload = payload
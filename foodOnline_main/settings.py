@@ -1,6 +1,6 @@
 from pathlib import Path
 
-from decouple import config
+from decouple import Csv, config
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -27,11 +27,14 @@ INSTALLED_APPS = [
     "menu",
     "marketplace",
     "customers",
-    'orders'
+    'orders',
+    "renditions",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "foodOnline_main.middleware.StaticFilesMiddleware",
+    "foodOnline_main.middleware.ReplicaPinMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -42,21 +45,33 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "foodOnline_main.urls"
 
+TEMPLATE_LOADERS = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+if not DEBUG:
+    # Compile each template once per process instead of on every request
+    TEMPLATE_LOADERS = [("django.template.loaders.cached.Loader", TEMPLATE_LOADERS)]
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": ["templates"],
-        "APP_DIRS": True,
         "OPTIONS": {
+            "loaders": TEMPLATE_LOADERS,
+            "libraries": {
+                # foodOnline_main is not an installed app, register its tags explicitly
+                "bundles": "foodOnline_main.templatetags.bundles",
+            },
             "context_processors": [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
                 "accounts.context_processors.get_vendor",
-                "marketplace.context_processors.get_cart_counter",
-                "marketplace.context_processors.get_cart_amounts",
+                "marketplace.context_processors.lazy_cart_context",
                 'accounts.context_processors.get_user_profile',
+                "accounts.context_processors.get_fragment_revision",
 
             ],
         },
@@ -64,22 +79,149 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "foodOnline_main.wsgi.application"
+ASGI_APPLICATION = "foodOnline_main.asgi.application"
+
+# Serve the cart AJAX endpoints from marketplace.async_views (deploy with an ASGI server)
+ASYNC_CART_VIEWS = config("ASYNC_CART_VIEWS", default=False, cast=bool)
+# Push new and updated orders to the vendor order list over server-sent events
+# (orders.async_views). Only under an ASGI server: a WSGI worker would hold a thread per
+# open stream. Streams end after ORDER_EVENTS_MAX_SECONDS, the browser then reconnects.
+ASYNC_ORDER_EVENTS = config("ASYNC_ORDER_EVENTS", default=False, cast=bool)
+ORDER_EVENTS_MAX_SECONDS = config("ORDER_EVENTS_MAX_SECONDS", default=5 * 60, cast=int)
 
 
+# Database connections
+# DB_CONN_MAX_AGE keeps connections open between requests (0 closes them after
+# every request). DB_POOL switches to an in-process pool, for ASGI servers where
+# persistent connections are not reused; requests beyond DB_POOL_MAX_SIZE wait up
+# to DB_POOL_TIMEOUT seconds for a connection, so size it to the worker's
+# concurrency. DB_PGBOUNCER is for PgBouncer in transaction pooling mode: no
+# server-side cursors. Django also sends SET TIME ZONE on connections whose
+# timezone isn't TIME_ZONE, which transaction pooling would leak to other
+# clients, so the database role must default to it:
+#   ALTER ROLE <DB_USER> SET timezone = 'UTC';
+DB_POOL = config("DB_POOL", default=False, cast=bool)
+DB_PGBOUNCER = config("DB_PGBOUNCER", default=False, cast=bool)
+
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
-        "NAME": "fooddb",
-        "USER": "user",
-        "PASSWORD": "123",
-        "HOST": "localhost",  # Or an IP address if the database is on a remote server
-        "PORT": "5432",  # Default PostgreSQL port
+        "ENGINE": "foodOnline_main.db_pool" if DB_POOL else "django.db.backends.postgresql",
+        "NAME": config("DB_NAME", default="fooddb"),
+        "USER": config("DB_USER", default="user"),
+        "PASSWORD": config("DB_PASSWORD", default="123"),
+        "HOST": config("DB_HOST", default="localhost"),  # Or an IP address if the database is on a remote server
+        "PORT": config("DB_PORT", default="5432"),  # Default PostgreSQL port
+        "CONN_MAX_AGE": 0 if DB_POOL else config("DB_CONN_MAX_AGE", default=60, cast=int),
+        "CONN_HEALTH_CHECKS": True,
+        "DISABLE_SERVER_SIDE_CURSORS": DB_PGBOUNCER,
+        "OPTIONS": {},
+    }
+}
+
+if DB_POOL:
+    DATABASES["default"]["OPTIONS"].update({
+        "pool_min_size": config("DB_POOL_MIN_SIZE", default=1, cast=int),
+        "pool_max_size": config("DB_POOL_MAX_SIZE", default=10, cast=int),
+        "pool_timeout": config("DB_POOL_TIMEOUT", default=30, cast=int),
+    })
+
+# Read replicas
+# DB_REPLICA_HOSTS lists "host" or "host:port" of streaming replicas of the primary.
+# Views decorated with foodOnline_main.routers.use_replica read from one of them,
+# clients that just wrote stay on the primary for REPLICA_PIN_SECONDS. To try it
+# locally any copy of the database works, e.g. a second SQLite file:
+#   DATABASES["replica"] = {**DATABASES["default"], "NAME": "replica.sqlite3"}
+#   DATABASE_REPLICAS = ["replica"]
+DB_REPLICA_HOSTS = config("DB_REPLICA_HOSTS", default="", cast=Csv())
+for n, replica_host in enumerate(DB_REPLICA_HOSTS, start=1):
+    replica_host, _, replica_port = replica_host.partition(":")
+    DATABASES[f"replica{n}"] = {
+        **DATABASES["default"],
+        "HOST": replica_host,
+        "PORT": replica_port or DATABASES["default"]["PORT"],
+        "OPTIONS": dict(DATABASES["default"]["OPTIONS"]),
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias.startswith("replica")]
+DATABASE_ROUTERS = ["foodOnline_main.routers.ReplicaRouter"]
+REPLICA_PIN_SECONDS = config("REPLICA_PIN_SECONDS", default=5, cast=int)
+
+
+# Limited items
+# Checkout holds their stock for STOCK_RESERVATION_SECONDS while the customer
+# pays, menus show what is left as of at most STOCK_CACHE_SECONDS ago. Stock of
+# expired reservations shows as left and goes back to the counters with the next
+# order of the item; schedule "python manage.py release_reservations" every few
+# minutes (cron, systemd timer) to return it even when nobody orders the item.
+STOCK_RESERVATION_SECONDS = config("STOCK_RESERVATION_SECONDS", default=900, cast=int)
+STOCK_CACHE_SECONDS = config("STOCK_CACHE_SECONDS", default=10, cast=int)
+
+
+# Cache configuration
+# CACHE_BACKEND is one of "locmem" (development), "file", "redis" or "memcached".
+# For redis/memcached CACHE_LOCATION is the server address, e.g. redis://127.0.0.1:6379/1.
+CACHE_BACKEND = config("CACHE_BACKEND", default="locmem")
+CACHE_LOCATION = config("CACHE_LOCATION", default="")
+CACHE_VERSION = config("CACHE_VERSION", default=1, cast=int)  # Bump to drop every cached entry
+CACHE_EARLY_RECOMPUTE_BETA = 1.0
+
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+    "memcached": "django.core.cache.backends.memcached.PyMemcacheCache",
+}
+
+
+def cache_config(name, timeout):
+    if CACHE_BACKEND == "locmem":
+        location = name
+    elif CACHE_BACKEND == "file":
+        location = str(BASE_DIR / ".cache" / name)
+    else:
+        location = CACHE_LOCATION
+    return {
+        "BACKEND": CACHE_BACKENDS[CACHE_BACKEND],
+        "LOCATION": location,
+        "TIMEOUT": timeout,
+        "KEY_PREFIX": f"foodonline:{name}",
+        "VERSION": CACHE_VERSION,
     }
+
+
+CACHES = {
+    "default": cache_config("default", 300),
+    "fragments": cache_config("fragments", 600),
+    "menus": cache_config("menus", 900),
+    "sessions": cache_config("sessions", 1209600),
 }
 
+
 AUTH_USER_MODEL = "accounts.User"
 
 
+# New passwords are hashed with PASSWORD_HASHER ("scrypt", "argon2" which needs argon2-cffi,
+# or "pbkdf2"). Hashes made by any other hasher of the list, or with other parameters, are
+# upgraded the next time their user logs in. Use "manage.py bench_hashers" to pick parameters.
+PASSWORD_HASHER = config("PASSWORD_HASHER", default="scrypt")
+PASSWORD_SCRYPT_WORK_FACTOR = config("PASSWORD_SCRYPT_WORK_FACTOR", default=2**14, cast=int)
+PASSWORD_SCRYPT_BLOCK_SIZE = config("PASSWORD_SCRYPT_BLOCK_SIZE", default=8, cast=int)
+PASSWORD_SCRYPT_PARALLELISM = config("PASSWORD_SCRYPT_PARALLELISM", default=1, cast=int)
+PASSWORD_ARGON2_TIME_COST = config("PASSWORD_ARGON2_TIME_COST", default=2, cast=int)
+PASSWORD_ARGON2_MEMORY_COST = config("PASSWORD_ARGON2_MEMORY_COST", default=19 * 1024, cast=int)  # KiB
+PASSWORD_ARGON2_PARALLELISM = config("PASSWORD_ARGON2_PARALLELISM", default=1, cast=int)
+
+PASSWORD_HASHER_CLASSES = {
+    "scrypt": "accounts.hashers.TunedScryptPasswordHasher",
+    "argon2": "accounts.hashers.TunedArgon2PasswordHasher",
+    "pbkdf2": "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+}
+PASSWORD_HASHERS = [PASSWORD_HASHER_CLASSES[PASSWORD_HASHER]] + [
+    hasher for name, hasher in PASSWORD_HASHER_CLASSES.items() if name != PASSWORD_HASHER
+] + [
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -108,11 +250,85 @@ STATIC_ROOT = BASE_DIR / "static"
 STATICFILES_DIRS = [
     "foodOnline_main/static",
 ]
+# collectstatic writes content hashed names plus gzip (and brotli, when installed) variants.
+STORAGES = {
+    "default": {"BACKEND": "foodOnline_main.storage.SignedMediaStorage"},
+    "staticfiles": {"BACKEND": "foodOnline_main.storage.CompressedManifestStaticFilesStorage"},
+}
+if DEBUG:
+    STORAGES["staticfiles"]["BACKEND"] = "django.contrib.staticfiles.storage.StaticFilesStorage"
+# Files concatenated and minified by collectstatic, see foodOnline_main.templatetags.bundles.
+# Each bundle keeps the position of its files in base.html relative to the CDN assets.
+STATIC_BUNDLES = {
+    "css/base.bundle.css": [
+        "css/iconmoon.css",
+        "css/style.css",
+        "css/cs-foodbakery-plugin.css",
+    ],
+    "js/base.bundle.js": [
+        "js/modernizr.js",
+        "js/bootstrap.js",
+    ],
+}
 
 # Media files configuration
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Uploaded files are served by foodOnline_main.media.serve_media. MEDIA_SERVER is "django"
+# (streamed by the app, with range support), "nginx" (X-Accel-Redirect to an internal
+# location MEDIA_ACCEL_PREFIX aliased to MEDIA_ROOT) or "apache" (X-Sendfile).
+MEDIA_SERVER = config("MEDIA_SERVER", default="django")
+MEDIA_ACCEL_PREFIX = config("MEDIA_ACCEL_PREFIX", default="/protected-media/")
+MEDIA_CACHE_MAX_AGE = 7 * 24 * 60 * 60  # Upload names are content hashes, they don't change
+# Signed urls expire after one to two MEDIA_URL_EXPIRE windows. Files under
+# MEDIA_PRIVATE_PREFIXES (vendor licenses and their renditions) always get signed urls.
+MEDIA_SIGNED_URLS = config("MEDIA_SIGNED_URLS", default=False, cast=bool)
+MEDIA_PRIVATE_PREFIXES = ("vendor/license/", "renditions/vendor/license/")
+MEDIA_URL_EXPIRE = config("MEDIA_URL_EXPIRE", default=24 * 60 * 60, cast=int)
+# MEDIA_STORAGE "s3" keeps uploads in an S3 compatible object store (AWS, MinIO, ...) through
+# django-storages, which then hands out presigned urls so media never goes through Django.
+MEDIA_STORAGE = config("MEDIA_STORAGE", default="local")
+if MEDIA_STORAGE == "s3":
+    STORAGES["default"] = {
+        "BACKEND": "storages.backends.s3.S3Storage",
+        "OPTIONS": {
+            "bucket_name": config("MEDIA_BUCKET_NAME"),
+            "endpoint_url": config("MEDIA_ENDPOINT_URL", default=None),
+            "access_key": config("MEDIA_ACCESS_KEY", default=None),
+            "secret_key": config("MEDIA_SECRET_KEY", default=None),
+            "querystring_auth": True,
+            "querystring_expire": MEDIA_URL_EXPIRE,
+            "file_overwrite": False,
+        },
+    }
+
+# Uploads are checked by accounts.upload_handlers.ImageUploadHandler while they stream in,
+# small files are then kept in memory and larger ones written to a temporary file.
+FILE_UPLOAD_HANDLERS = [
+    "accounts.upload_handlers.ImageUploadHandler",
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+UPLOAD_DEFAULT_SIZE_LIMIT = 5 * 1024 * 1024
+UPLOAD_SIZE_LIMITS = {
+    "image": 5 * 1024 * 1024,
+    "profile_picture": 2 * 1024 * 1024,
+    "cover_photo": 5 * 1024 * 1024,
+    "vendor_license": 5 * 1024 * 1024,
+}
+UPLOAD_MAX_IMAGE_DIMENSION = 6000
+
+# Resized copies of uploaded images, generated in a background worker pool
+RENDITION_SIZES = {
+    "thumb": (150, 150),
+    "card": (400, 300),
+    "hero": (1200, 500),
+}
+RENDITION_QUALITY = 82
+RENDITION_WORKERS = config("RENDITION_WORKERS", default=2, cast=int)
+RENDITION_EXISTS_TIMEOUT = 86400
+
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -135,6 +351,57 @@ DEFAULT_FROM_EMAIL = "foodOnline Marketplace <shbkhan@bestpeers.com>"
 # Rest_configuration
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework.authentication.TokenAuthentication",
+        "accounts.authentication.CachedTokenAuthentication",
+    ),
+    # json through orjson when it is installed, see foodOnline_main.fastjson
+    "DEFAULT_RENDERER_CLASSES": (
+        "foodOnline_main.fastjson.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
     ),
+    "DEFAULT_PARSER_CLASSES": (
+        "foodOnline_main.fastjson.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
+}
+
+# API tokens expire API_TOKEN_TTL seconds after they were issued, a login after
+# API_TOKEN_ROTATE_AFTER hands out a new one. Token lookups are cached for API_TOKEN_CACHE_TIMEOUT
+# when CACHE_BACKEND is shared between processes (not "locmem"), so revocation reaches all of them.
+API_TOKEN_TTL = config("API_TOKEN_TTL", default=7 * 24 * 60 * 60, cast=int)
+API_TOKEN_ROTATE_AFTER = config("API_TOKEN_ROTATE_AFTER", default=24 * 60 * 60, cast=int)
+API_TOKEN_CACHE_TIMEOUT = 60
+
+# Publish/subscribe backend of the order event streams. LocalBroker only reaches the
+# streams of the publishing process, use foodOnline_main.broker.RedisBroker with
+# OPTIONS {"url": "redis://..."} when several ASGI workers serve them.
+EVENT_BROKER = {
+    "BACKEND": config("EVENT_BROKER_BACKEND", default="foodOnline_main.broker.LocalBroker"),
+    "OPTIONS": {"url": config("EVENT_BROKER_URL", default="")},
+}
+
+# With a cache shared by every process (CACHE_BACKEND redis or memcached) sessions are
+# read from the "sessions" cache and written through to the database, see
+# foodOnline_main.sessions. A per-process cache (locmem, file) would keep serving a
+# session that was logged out or flushed in another worker, so they stay in the database.
+# "django.contrib.sessions.backends.cache" drops the database entirely, but also needs
+# a shared CACHE_BACKEND.
+SESSION_ENGINE = config(
+    "SESSION_ENGINE",
+    default="foodOnline_main.sessions" if CACHE_BACKEND in ("redis", "memcached") else "django.contrib.sessions.backends.db",
+)
+SESSION_CACHE_ALIAS = "sessions"
+
+# Rate limits of foodOnline_main.throttling, as "requests/period" with period s, m, h or d.
+# Each scope is limited separately per client address and per user or submitted email.
+# The counters live in the THROTTLE_CACHE alias. With CACHE_BACKEND "locmem" every process
+# keeps its own counters, so N workers let N times the rates through ("file" is shared by the
+# workers of one host only). Limits hold across workers with "redis" or "memcached".
+THROTTLE_ENABLED = config("THROTTLE_ENABLED", default=True, cast=bool)
+THROTTLE_CACHE = "default"
+THROTTLE_NUM_PROXIES = config("THROTTLE_NUM_PROXIES", default=0, cast=int)  # Proxies adding X-Forwarded-For
+THROTTLE_RATES = {
+    "login": "10/m",
+    "password_reset": "5/h",
+    "cart": "120/m",
 }
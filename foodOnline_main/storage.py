@@ -0,0 +1,162 @@
+import gzip
+import re
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, only gzip variants are written without it
+    brotli = None
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+COMPRESSIBLE_EXTENSIONS = (".css", ".js", ".svg", ".eot", ".ttf", ".map", ".txt", ".json", ".xml")
+# Compressing tiny files costs more in headers and CPU than it saves on the wire
+MIN_COMPRESS_SIZE = 512
+
+# String literals and /*! ... */ licence blocks are kept as they are, other comments are dropped
+CSS_KEPT = r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|/\*!.*?\*/)"""
+CSS_COMMENT_RE = re.compile(CSS_KEPT + r"|/\*.*?\*/", re.S)
+CSS_KEPT_RE = re.compile(CSS_KEPT, re.S)
+CSS_SPACE_RE = re.compile(r"\s+")
+CSS_PUNCTUATION_RE = re.compile(r"\s*([{};,>])\s*")
+
+
+def minify_css(source):
+    """Strip comments and redundant whitespace, preserving strings and ``/*! ... */`` licence blocks."""
+    if rcssmin is not None:
+        return rcssmin.cssmin(source, keep_bang_comments=True)
+    source = CSS_COMMENT_RE.sub(lambda match: match[1] or "", source)
+    # Odd parts are the kept strings and licence blocks
+    parts = CSS_KEPT_RE.split(source)
+    for i in range(0, len(parts), 2):
+        squeezed = CSS_SPACE_RE.sub(" ", parts[i])
+        parts[i] = CSS_PUNCTUATION_RE.sub(r"\1", squeezed).replace(";}", "}")
+    return "".join(parts).strip()
+
+
+def minify_js(source):
+    # Without rjsmin the sources are only concatenated, a home-made JS minifier is not worth the risk
+    if rjsmin is not None:
+        return rjsmin.jsmin(source, keep_bang_comments=True)
+    return source
+
+
+def build_bundle(name, sources):
+    """Concatenate and minify the ``sources`` of the bundle ``name`` found by the staticfiles finders."""
+    minify = minify_css if name.endswith(".css") else minify_js
+    parts = []
+    for source in sources:
+        path = finders.find(source)
+        if path is None:
+            raise ValueError(f"The file '{source}' of the bundle '{name}' could not be found.")
+        with open(path, encoding="utf-8") as f:
+            parts.append(minify(f.read()))
+    # JS files don't always end with a semicolon, keep them from running into each other
+    separator = "\n" if name.endswith(".css") else ";\n"
+    return separator.join(parts)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Manifest storage that also builds the ``STATIC_BUNDLES`` and writes a
+    ``.gz`` (and ``.br`` when brotli is installed) copy next to every hashed
+    text file, so they can be served precompressed by
+    ``foodOnline_main.middleware.StaticFilesMiddleware`` or the web server.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            return
+
+        for name, sources in settings.STATIC_BUNDLES.items():
+            if self.exists(name):
+                self.delete(name)
+            self._save(name, ContentFile(build_bundle(name, sources).encode()))
+            paths[name] = (self, name)
+
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            yield name, hashed_name, processed
+            if hashed_name and not isinstance(processed, Exception):
+                self.compress(hashed_name)
+
+    def url_converter(self, name, hashed_files, template=None):
+        converter = super().url_converter(name, hashed_files, template)
+
+        def converter_or_original(matchobj):
+            # The theme CSS points at a few images that were never shipped, leave those urls as they are
+            try:
+                return converter(matchobj)
+            except ValueError:
+                return matchobj["matched"]
+
+        return converter_or_original
+
+    def compress(self, name):
+        if not name.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+            return
+        with self.open(name) as f:
+            content = f.read()
+        if len(content) < MIN_COMPRESS_SIZE:
+            return
+
+        variants = {".gz": gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants[".br"] = brotli.compress(content, quality=11)
+        for extension, compressed in variants.items():
+            # Only keep variants that actually make the response smaller
+            if len(compressed) < len(content):
+                if self.exists(name + extension):
+                    self.delete(name + extension)
+                self._save(name + extension, ContentFile(compressed))
+
+
+def sign_media(name, expires):
+    return salted_hmac("foodOnline_main.media", f"{name}:{expires}").hexdigest()[:32]
+
+
+def media_needs_signature(name):
+    return settings.MEDIA_SIGNED_URLS or name.replace("\\", "/").startswith(settings.MEDIA_PRIVATE_PREFIXES)
+
+
+def check_media_signature(name, expires, signature):
+    try:
+        expired = int(expires) < time.time()
+    except (TypeError, ValueError):
+        return False
+    return not expired and constant_time_compare(sign_media(name, expires), signature or "")
+
+
+class SignedMediaStorage(FileSystemStorage):
+    """
+    Local media storage whose urls carry an expiring signature when
+    ``MEDIA_SIGNED_URLS`` is on or the file is private, checked by
+    ``foodOnline_main.media.serve_media``.
+
+    The expiry is rounded up to a ``MEDIA_URL_EXPIRE`` window so a file keeps the
+    same url for a while and stays cacheable by browsers and the page caches.
+    """
+
+    def url(self, name):
+        url = super().url(name)
+        if not name or not media_needs_signature(name):
+            return url
+        window = settings.MEDIA_URL_EXPIRE
+        expires = (int(time.time()) // window + 2) * window
+        name = name.replace("\\", "/")
+        return f"{url}?{urlencode({'expires': expires, 'signature': sign_media(name, expires)})}"
@@ -0,0 +1,25 @@
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+register = template.Library()
+
+TAGS = {
+    ".css": '<link href="{}" rel="stylesheet">',
+    ".js": '<script src="{}"></script>',
+}
+
+
+@register.simple_tag
+def bundle(name):
+    """
+    Link the ``STATIC_BUNDLES`` entry ``name``.
+
+    The bundle is built by collectstatic, so in DEBUG the source files are
+    linked one by one instead.
+    """
+    tag = TAGS[name[name.rindex("."):]]
+    if settings.DEBUG:
+        return format_html_join("\n", tag, ((static(source),) for source in settings.STATIC_BUNDLES[name]))
+    return format_html(tag, static(name))
@@ -0,0 +1,255 @@
+import math
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from django.http import HttpResponse, JsonResponse
+from rest_framework.throttling import BaseThrottle
+
+from .caching import make_key
+
+# Atomic token bucket: refill by elapsed time, then take one token if there is one.
+# Returns {allowed, seconds to wait} with the wait as a string, Lua numbers are truncated to integers.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call("HMGET", KEYS[1], "tokens", "ts")
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call("HSET", KEYS[1], "tokens", tokens, "ts", now)
+redis.call("EXPIRE", KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(wait)}
+"""
+
+# Give back the token taken by a request another limit rejected
+TOKEN_REFUND_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local tokens = tonumber(redis.call("HGET", KEYS[1], "tokens"))
+if tokens then
+    redis.call("HSET", KEYS[1], "tokens", math.min(capacity, tokens + 1))
+end
+"""
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """``"10/m"`` -> ``(10, 60)``, like DRF's throttle rates."""
+    num, period = rate.split("/")
+    return int(num), PERIODS[period[0]]
+
+
+def get_client_ip(request):
+    """Client address, skipping the ``THROTTLE_NUM_PROXIES`` reverse proxies in front of the app."""
+    num_proxies = settings.THROTTLE_NUM_PROXIES
+    forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
+    if num_proxies and forwarded_for:
+        addresses = [address.strip() for address in forwarded_for.split(",")]
+        return addresses[-min(num_proxies, len(addresses))]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def ip_identity(request):
+    return make_key("ip", get_client_ip(request))
+
+
+def user_identity(request):
+    # Anonymous clients share the limits of their address
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return make_key("user", user.pk)
+    return ip_identity(request)
+
+
+def post_field_identity(field):
+    """
+    Identity from a submitted field, e.g. the email someone tries to log in
+    as, from the client's address. Keyed on the field alone, anyone could keep
+    someone else's email locked out.
+    """
+
+    def identity(request):
+        value = request.POST.get(field) or (getattr(request, "data", None) or {}).get(field)
+        return make_key(ip_identity(request), field, str(value).strip().lower()) if value else None
+
+    return identity
+
+
+IDENTITIES = {"ip": ip_identity, "user": user_identity}
+
+
+class Limiter:
+    """
+    Rate limits kept in the shared cache.
+
+    With Django's redis backend every limit is a token bucket updated by one
+    atomic Lua script. Other backends only offer atomic ``add``/``incr``, so
+    a sliding window counter is used instead, which enforces the same average
+    rate with a slightly less smooth burst.
+    """
+
+    def __init__(self, cache_alias=None):
+        self.cache = caches[cache_alias or settings.THROTTLE_CACHE]
+
+    def hit(self, key, rate):
+        """Count one request against ``key``, return ``(allowed, seconds to wait)``."""
+        num, period = parse_rate(rate)
+        key = make_key("throttle", key)
+        if isinstance(self.cache, RedisCache):
+            return self.token_bucket(key, num, period)
+        return self.sliding_window(key, num, period)
+
+    def refund(self, key, rate):
+        """Take back a request counted by :meth:`hit`."""
+        num, period = parse_rate(rate)
+        key = make_key("throttle", key)
+        if isinstance(self.cache, RedisCache):
+            client = self.cache._cache.get_client(key, write=True)
+            client.eval(TOKEN_REFUND_SCRIPT, 1, self.cache.make_and_validate_key(key), num)
+        else:
+            try:
+                self.cache.decr(make_key(key, int(time.time() // period)))
+            except ValueError:
+                pass
+
+    def token_bucket(self, key, num, period):
+        client = self.cache._cache.get_client(key, write=True)
+        allowed, wait = client.eval(
+            TOKEN_BUCKET_SCRIPT, 1, self.cache.make_and_validate_key(key), num, num / period, time.time()
+        )
+        return bool(allowed), float(wait)
+
+    def sliding_window(self, key, num, period):
+        now = time.time()
+        window = int(now // period)
+        current_key = make_key(key, window)
+        self.cache.add(current_key, 0, period * 2)
+        try:
+            current = self.cache.incr(current_key)
+        except ValueError:
+            self.cache.set(current_key, 1, period * 2)
+            current = 1
+        previous = self.cache.get(make_key(key, window - 1), 0)
+        elapsed = now - window * period
+        # Requests of the previous window still inside the sliding window, assuming they were evenly spread
+        estimate = previous * (period - elapsed) / period + current
+        if estimate <= num:
+            return True, 0.0
+        # Rejected requests don't count, or a client retrying would never get through again
+        self.cache.decr(current_key)
+        return False, period - elapsed
+
+
+def check_limits(request, scope, limits):
+    """Apply every ``(identity, rate)`` of ``limits``, return the longest wait or ``None`` when allowed."""
+    limiter = Limiter()
+    counted, waits = [], []
+    for identity, rate in limits:
+        value = identity(request)
+        if value is None:
+            continue
+        key = make_key(scope, value)
+        allowed, wait = limiter.hit(key, rate)
+        if allowed:
+            counted.append((key, rate))
+        else:
+            waits.append(wait)
+    if not waits:
+        return None
+    # A rejected request doesn't count against the limits it passed either
+    for key, rate in counted:
+        limiter.refund(key, rate)
+    return max(waits)
+
+
+def throttled_response(request, wait):
+    message = "Too many requests, please try again later."
+    if request.headers.get("x-requested-with") == "XMLHttpRequest":
+        response = JsonResponse({"status": "Failed", "message": message}, status=429)
+    else:
+        response = HttpResponse(message, status=429)
+    response["Retry-After"] = math.ceil(wait)
+    return response
+
+
+def throttle(scope, keys=("ip",), methods=None):
+    """
+    Reject requests over the ``THROTTLE_RATES`` of ``scope`` with a 429 before
+    the view runs. ``keys`` are "ip", "user" or callables returning an
+    identity, each one is limited separately. Works on sync and async views.
+    """
+    rate = settings.THROTTLE_RATES[scope]
+    limits = [(IDENTITIES.get(key, key), rate) for key in keys]
+
+    def applies(request):
+        return settings.THROTTLE_ENABLED and (methods is None or request.method in methods)
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+
+            @wraps(view_func)
+            async def _wrapped_view(request, *args, **kwargs):
+                if applies(request):
+                    # request.user and the cache are sync, keep them off the event loop
+                    wait = await sync_to_async(check_limits)(request, scope, limits)
+                    if wait is not None:
+                        return throttled_response(request, wait)
+                return await view_func(request, *args, **kwargs)
+
+        else:
+
+            @wraps(view_func)
+            def _wrapped_view(request, *args, **kwargs):
+                if applies(request):
+                    wait = check_limits(request, scope, limits)
+                    if wait is not None:
+                        return throttled_response(request, wait)
+                return view_func(request, *args, **kwargs)
+
+        return _wrapped_view
+
+    return decorator
+
+
+class BucketThrottle(BaseThrottle):
+    """
+    DRF throttle sharing the limits of :func:`throttle`. Subclasses set
+    ``scope`` and ``keys``.
+    """
+
+    scope = None
+    keys = ("ip",)
+
+    def allow_request(self, request, view):
+        if not settings.THROTTLE_ENABLED:
+            return True
+        rate = settings.THROTTLE_RATES[self.scope]
+        limits = [(IDENTITIES.get(key, key), rate) for key in self.keys]
+        self.retry_after = check_limits(request, self.scope, limits)
+        return self.retry_after is None
+
+    def wait(self):
+        return self.retry_after
+
+
+class LoginThrottle(BucketThrottle):
+    scope = "login"
+    keys = ("ip", post_field_identity("email"))
+
+
+class PasswordResetThrottle(BucketThrottle):
+    scope = "password_reset"
+    keys = ("ip", post_field_identity("email"))
@@ -1,11 +1,12 @@
+import re
+
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
 
 from marketplace import views as MarketplaceViews
 
-from . import views
+from . import media, views
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -19,4 +20,9 @@ urlpatterns = [
     path('checkout/', MarketplaceViews.CheckoutView.as_view(), name='checkout'),
     # ORDERS
     path('orders/', include('orders.urls')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
+
+if settings.MEDIA_STORAGE == "local":
+    urlpatterns += [
+        re_path(r"^%s(?P<path>.*)$" % re.escape(settings.MEDIA_URL.lstrip("/")), media.serve_media, name="media"),
+    ]
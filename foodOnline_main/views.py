@@ -1,11 +1,16 @@
 from django.http import HttpResponse
 from django.shortcuts import render
 
-from vendor.models import Vendor
+from vendor.featured import get_featured_vendors
 
+from .caching import cache_page_for_anonymous
+from .routers import use_replica
 
+
+@use_replica
+@cache_page_for_anonymous(60, tags=["vendors"])
 def home(request):
-    vendors = Vendor.objects.filter(is_approved=True, user__is_active=True)[:8]
+    vendors = get_featured_vendors()
     context = {
         "vendors": vendors,
     }
@@ -0,0 +1,145 @@
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError
+from django.db.models import F, Sum
+
+from foodOnline_main.caching import invalidate_tags, make_key
+from foodOnline_main.fastjson import FastJsonResponse
+from foodOnline_main.throttling import throttle
+from menu.models import FoodItem
+
+from .context_processors import calculate_cart_amounts
+from .models import Cart, Tax
+
+
+# Cache I/O with redis or memcached would block the event loop
+ainvalidate_tags = sync_to_async(invalidate_tags)
+
+
+@sync_to_async
+def get_user(request):
+    # request.user is a lazy session + user lookup, resolve it outside the event loop
+    return request.user if request.user.is_authenticated else None
+
+
+async def aget_cart_counter(user):
+    cart = await Cart.objects.filter(user=user).aaggregate(cart_count=Sum("quantity"))
+    return dict(cart_count=cart["cart_count"] or 0)
+
+
+async def aget_cart_amounts(user):
+    cart_items = [
+        item async for item in Cart.objects.filter(user=user).select_related("fooditem")
+    ]
+    taxes = [tax async for tax in Tax.objects.filter(is_active=True)]
+    return calculate_cart_amounts(cart_items, taxes)
+
+
+async def check_cart_request(request):
+    """Return the user, or the error response when the request is not a logged in AJAX call."""
+    user = await get_user(request)
+    if user is None:
+        return None, FastJsonResponse(
+            {"status": "login_required", "message": "Please login to continue"}
+        )
+    if request.headers.get('x-requested-with') != 'XMLHttpRequest':
+        return None, FastJsonResponse({"status": "Failed", "message": "Invalid request!"})
+    return user, None
+
+
+@throttle("cart", keys=("user",))
+async def add_to_cart(request, food_id):
+    user, error = await check_cart_request(request)
+    if error:
+        return error
+
+    try:
+        fooditem = await FoodItem.objects.aget(id=food_id)
+    except FoodItem.DoesNotExist:
+        return FastJsonResponse({"status": "Failed", "message": "This food does not exist!"})
+    # Switched off, sold out or outside its window
+    if not await FoodItem.objects.available().filter(pk=fooditem.pk).aexists():
+        return FastJsonResponse({"status": "Failed", "message": "This food is not available right now!"})
+
+    # Single UPDATE instead of read-modify-write, so concurrent clicks don't lose increments
+    cart_items = Cart.objects.filter(user=user, fooditem=fooditem)
+    if await cart_items.aupdate(quantity=F("quantity") + 1):
+        await ainvalidate_tags(make_key("user", user.pk))
+        chkCart = await cart_items.afirst()
+        message = "Increased the cart quantity"
+    else:
+        try:
+            chkCart = await Cart.objects.acreate(user=user, fooditem=fooditem, quantity=1)
+            message = "Added the food to the cart"
+        except IntegrityError:
+            # A concurrent click created the row first
+            await cart_items.aupdate(quantity=F("quantity") + 1)
+            await ainvalidate_tags(make_key("user", user.pk))
+            chkCart = await cart_items.afirst()
+            message = "Increased the cart quantity"
+
+    return FastJsonResponse(
+        {
+            "status": "Success",
+            "message": message,
+            "cart_counter": await aget_cart_counter(user),
+            "qty": chkCart.quantity,
+            "cart_amount": await aget_cart_amounts(user),
+        }
+    )
+
+
+@throttle("cart", keys=("user",))
+async def decrease_cart(request, food_id):
+    user, error = await check_cart_request(request)
+    if error:
+        return error
+
+    try:
+        fooditem = await FoodItem.objects.aget(id=food_id)
+    except FoodItem.DoesNotExist:
+        return FastJsonResponse({"status": "Failed", "message": "This food does not exist!"})
+
+    cart_items = Cart.objects.filter(user=user, fooditem=fooditem)
+    chkCart = await cart_items.afirst()
+    if chkCart is None:
+        return FastJsonResponse(
+            {"status": "Failed", "message": "You do not have this item in your cart!"}
+        )
+
+    if await cart_items.filter(quantity__gt=1).aupdate(quantity=F("quantity") - 1):
+        await ainvalidate_tags(make_key("user", user.pk))
+        chkCart.quantity -= 1
+    else:
+        await chkCart.adelete()
+        chkCart.quantity = 0
+
+    return FastJsonResponse(
+        {
+            "status": "Success",
+            "cart_counter": await aget_cart_counter(user),
+            "qty": chkCart.quantity,
+            "cart_amount": await aget_cart_amounts(user),
+        }
+    )
+
+
+@throttle("cart", keys=("user",))
+async def delete_cart(request, cart_id):
+    user, error = await check_cart_request(request)
+    if error:
+        return error
+
+    try:
+        cart_item = await Cart.objects.aget(user=user, id=cart_id)
+    except Cart.DoesNotExist:
+        return FastJsonResponse({"status": "Failed", "message": "Cart Item does not exist!"})
+
+    await cart_item.adelete()
+    return FastJsonResponse(
+        {
+            "status": "Success",
+            "message": "Cart item has been deleted!",
+            "cart_counter": await aget_cart_counter(user),
+            "cart_amount": await aget_cart_amounts(user),
+        }
+    )
@@ -1,4 +1,7 @@
-from menu.models import FoodItem
+from django.utils.functional import SimpleLazyObject
+
+from foodOnline_main.money import compute_totals, from_cents
+
 from .models import Cart, Tax
 
 
@@ -17,39 +20,43 @@ def get_cart_counter(request):
     return dict(cart_count=cart_count)
 
 
-def get_cart_amounts(request):
-    subtotal = 0
-    tax = 0
-    grand_total = 0
-    tax_dict = {}
-
-    if request.user.is_authenticated:
-        cart_items = Cart.objects.filter(user=request.user)
-
-        for item in cart_items:
-            fooditem = FoodItem.objects.get(pk=item.fooditem.id)
-            subtotal += (
-                fooditem.price * item.quantity
-            ) 
-
-            get_tax = Tax.objects.filter(is_active=True)
-
-            for i in get_tax:
-                tax_type = i.tax_type
-                tax_percentage = i.tax_percentage
-                tax_amount = round((tax_percentage * subtotal)/100, 2)
-
-                # Update the tax dictionary with the calculated tax amount
-                tax_dict.update({tax_type: {str(tax_percentage) : tax_amount}})
-
-                tax = sum(x for key in tax_dict.values() for x in key.values())
-                grand_total = subtotal + tax 
+def calculate_cart_amounts(cart_items, taxes):
+    # Added up in integer cents, see foodOnline_main.money.compute_totals
+    subtotal, tax_cents, tax, grand_total = compute_totals(
+        [(item.fooditem.price, item.quantity) for item in cart_items],
+        [(i.tax_type, i.tax_percentage) for i in taxes] if cart_items else [],
+    )
+    tax_dict = {
+        tax_type: {percentage: from_cents(amount) for percentage, amount in amounts.items()}
+        for tax_type, amounts in tax_cents.items()
+    }
 
     return dict(
-        subtotal=subtotal, 
-        tax=tax, 
-        grand_total=grand_total, 
+        subtotal=from_cents(subtotal), 
+        tax=from_cents(tax), 
+        grand_total=from_cents(grand_total), 
         tax_dict=tax_dict
         )
 
 
+def get_cart_amounts(request):
+    if not request.user.is_authenticated:
+        return calculate_cart_amounts([], [])
+
+    cart_items = Cart.objects.filter(user=request.user).select_related("fooditem")
+    return calculate_cart_amounts(list(cart_items), Tax.objects.filter(is_active=True))
+
+
+def lazy_cart_context(request):
+    # Templates get the same values as get_cart_counter/get_cart_amounts, but the
+    # queries only run when a template actually renders them (e.g. not when the
+    # navbar comes from the fragment cache). Templates call callables, so the
+    # values reach filters and number formatting as real numbers, not lazy proxies.
+    amounts = SimpleLazyObject(lambda: get_cart_amounts(request))
+    counter = SimpleLazyObject(lambda: get_cart_counter(request))
+    context = {
+        key: (lambda key=key: amounts[key])
+        for key in ("subtotal", "tax", "grand_total", "tax_dict")
+    }
+    context["cart_count"] = lambda: counter["cart_count"]
+    return context
@@ -0,0 +1,84 @@
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test the cart AJAX endpoints of a running server. Run it once against "
+        "a WSGI server and once against an ASGI server with ASYNC_CART_VIEWS=True "
+        "to compare requests/sec."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000")
+        parser.add_argument("--sessionid", required=True, help="Session cookie of a logged in customer")
+        parser.add_argument("--food-id", type=int, required=True)
+        parser.add_argument("--concurrency", type=int, default=500)
+        parser.add_argument("--requests", type=int, default=10000)
+
+    async def client(self, host, port, paths, headers, counter, latencies, errors):
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while counter[0] > 0:
+                counter[0] -= 1
+                path = paths[counter[0] % 2]
+                start = time.perf_counter()
+                writer.write(f"GET {path} HTTP/1.1\r\n{headers}\r\n".encode())
+                await writer.drain()
+                status_line = await reader.readline()
+                length = 0
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b""):
+                        break
+                    name, _, value = line.decode().partition(":")
+                    if name.lower() == "content-length":
+                        length = int(value)
+                await reader.readexactly(length)
+                latencies.append(time.perf_counter() - start)
+                if b" 200 " not in status_line:
+                    errors.append(status_line)
+        finally:
+            writer.close()
+
+    async def run(self, options):
+        url = urlsplit(options["url"])
+        host, port = url.hostname, url.port or 80
+        # Alternate add and decrease so the cart stays the same size during the run
+        paths = [
+            f"/marketplace/add_to_cart/{options['food_id']}/",
+            f"/marketplace/decrease_cart/{options['food_id']}/",
+        ]
+        headers = (
+            f"Host: {url.netloc}\r\n"
+            f"Cookie: sessionid={options['sessionid']}\r\n"
+            "X-Requested-With: XMLHttpRequest\r\n"
+            "Connection: keep-alive\r\n"
+        )
+        counter = [options["requests"]]
+        latencies, errors = [], []
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(
+                self.client(host, port, paths, headers, counter, latencies, errors)
+                for _ in range(options["concurrency"])
+            ),
+            return_exceptions=True,
+        )
+        return time.perf_counter() - start, latencies, errors
+
+    def handle(self, *args, **options):
+        elapsed, latencies, errors = asyncio.run(self.run(options))
+        if not latencies:
+            raise CommandError("No request completed, is the server running?")
+
+        latencies.sort()
+        self.stdout.write(f"Requests:    {len(latencies)} ({len(errors)} non-200)")
+        self.stdout.write(f"Concurrency: {options['concurrency']}")
+        self.stdout.write(f"Throughput:  {len(latencies) / elapsed:.1f} requests/sec")
+        self.stdout.write(f"Latency p50: {statistics.median(latencies) * 1000:.1f} ms")
+        self.stdout.write(f"Latency p99: {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f} ms")
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = "Measure per-request database connection cost with and without CONN_MAX_AGE."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--database", default="default")
+
+    def simulate_requests(self, connection, count):
+        # Django opens and closes connections around request_started/request_finished,
+        # so firing the signals reproduces what a real request does to the connection.
+        start = time.perf_counter()
+        for _ in range(count):
+            request_started.send(sender=self.__class__)
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            request_finished.send(sender=self.__class__)
+        return (time.perf_counter() - start) / count * 1000
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        count = options["requests"]
+        original_max_age = connection.settings_dict["CONN_MAX_AGE"]
+
+        results = {}
+        try:
+            for label, max_age in (("CONN_MAX_AGE=0", 0), ("persistent", 600)):
+                connection.close()
+                connection.settings_dict["CONN_MAX_AGE"] = max_age
+                results[label] = self.simulate_requests(connection, count)
+        finally:
+            connection.close()
+            connection.settings_dict["CONN_MAX_AGE"] = original_max_age
+
+        for label, per_request in results.items():
+            self.stdout.write(f"{label:<16} {per_request:.3f} ms/request")
+        saved = results["CONN_MAX_AGE=0"] - results["persistent"]
+        self.stdout.write(self.style.SUCCESS(f"Connection setup cost per request: {saved:.3f} ms"))
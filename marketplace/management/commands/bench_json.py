@@ -0,0 +1,90 @@
+import datetime
+import json
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from foodOnline_main import fastjson
+
+
+def menu_payload(items):
+    """A menu tree shaped like the vendor menu endpoint's, with ``items`` items."""
+    categories = [
+        {"id": n, "category_name": f"Category {n}", "slug": f"category-{n}", "description": "", "fooditems": []}
+        for n in range(max(1, items // 25))
+    ]
+    now = timezone.now()
+    for n in range(items):
+        categories[n % len(categories)]["fooditems"].append({
+            "id": n,
+            "food_title": f"Item {n}",
+            "slug": f"item-{n}",
+            "description": "A description of a realistic length for a menu item, two lines or so.",
+            "price": Decimal("9.50") + n,
+            "image": f"/media/foodimages/{uuid.uuid4().hex[:16]}.jpg",
+            "updated_at": now - datetime.timedelta(minutes=n),
+        })
+    return {"vendor": "Vendor", "vendor_slug": "vendor-1", "categories": categories}
+
+
+def cart_payload():
+    """What the add to cart views answer."""
+    return {
+        "status": "Success",
+        "message": "Increased the cart quantity",
+        "cart_counter": {"cart_count": 7},
+        "qty": 3,
+        "cart_amount": {
+            "subtotal": Decimal("54.50"),
+            "tax": Decimal("4.09"),
+            "grand_total": Decimal("58.59"),
+            "tax_dict": {"VAT": {"5.00": Decimal("2.73")}, "Service": {"2.50": Decimal("1.36")}},
+        },
+    }
+
+
+class Command(BaseCommand):
+    help = "Compare json encoders and decoders on typical menu and cart payloads."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, default=500, help="Items of the menu payload")
+        parser.add_argument("--seconds", type=float, default=1.0, help="Time spent on each case")
+
+    def measure(self, function, payload):
+        count = 0
+        start = time.perf_counter()
+        deadline = start + self.seconds
+        while time.perf_counter() < deadline:
+            function(payload)
+            count += 1
+        return (time.perf_counter() - start) / count * 1e6
+
+    def handle(self, *args, **options):
+        self.seconds = options["seconds"]
+        renderer = JSONRenderer()
+        fallback = fastjson.Encoder(separators=(",", ":"), ensure_ascii=False)
+        encoders = {
+            "DRF JSONRenderer": renderer.render,
+            "JsonResponse (DjangoJSONEncoder)": lambda data: json.dumps(data, cls=DjangoJSONEncoder).encode(),
+            "fastjson, standard library": lambda data: fallback.encode(data).encode(),
+        }
+        if fastjson.orjson is not None:
+            encoders["fastjson, orjson"] = fastjson.dumps
+        decoders = {"json.loads": json.loads}
+        if fastjson.orjson is not None:
+            decoders["orjson.loads"] = fastjson.orjson.loads
+
+        payloads = {f"menu ({options['items']} items)": menu_payload(options["items"]), "cart": cart_payload()}
+        self.stdout.write(f"{'payload':<20} {'codec':<34} {'us/op':>10} {'bytes':>8}")
+        for name, payload in payloads.items():
+            for codec, encode in encoders.items():
+                size = len(encode(payload))
+                self.stdout.write(f"{name:<20} {codec:<34} {self.measure(encode, payload):>10.1f} {size:>8}")
+            encoded = fastjson.dumps(payload)
+            for codec, decode in decoders.items():
+                self.stdout.write(f"{name:<20} {codec:<34} {self.measure(decode, encoded):>10.1f}")
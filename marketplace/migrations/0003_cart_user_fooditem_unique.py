@@ -0,0 +1,31 @@
+# Generated by Django 4.2.15 on 2026-10-19 20:01
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_cart_rows(apps, schema_editor):
+    Cart = apps.get_model('marketplace', 'Cart')
+    duplicates = (
+        Cart.objects.values('user', 'fooditem')
+        .annotate(rows=Count('id'), keep=Min('id'), total=Sum('quantity'))
+        .filter(rows__gt=1)
+    )
+    for row in duplicates:
+        Cart.objects.filter(pk=row['keep']).update(quantity=row['total'])
+        Cart.objects.filter(user=row['user'], fooditem=row['fooditem']).exclude(pk=row['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0002_tax'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_cart_rows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cart',
+            constraint=models.UniqueConstraint(fields=('user', 'fooditem'), name='cart_user_fooditem_unique'),
+        ),
+    ]
@@ -11,6 +11,12 @@ class Cart(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            # Concurrent "add" clicks increment the one row instead of creating a second
+            models.UniqueConstraint(fields=["user", "fooditem"], name="cart_user_fooditem_unique"),
+        ]
+
     def __unicode__(self):
         return self.user
 
@@ -0,0 +1,13 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from foodOnline_main.caching import invalidate_tags, make_key
+
+from .models import Cart
+
+
+@receiver(post_save, sender=Cart)
+@receiver(post_delete, sender=Cart)
+def cart_changed_receiver(sender, instance, **kwargs):
+    # The cart counter lives in the cached navbar fragment
+    invalidate_tags(make_key("user", instance.user_id))
@@ -1,3 +1,33 @@
+from django.core.cache import caches
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from orders.tests import AJAX, create_fooditem, create_user, create_vendor
+
+from .models import Cart
+
+
+class AddToCartTests(TestCase):
+    def setUp(self):
+        for alias in caches:
+            caches[alias].clear()
+        self.dosa = create_fooditem(create_vendor('dosacorner'), 'Dosa')
+        self.customer = create_user('asha')
+        self.client.force_login(self.customer)
+
+    def add(self, fooditem):
+        return self.client.get(reverse('add_to_cart', args=[fooditem.pk]), **AJAX).json()
+
+    def test_adds_then_increases(self):
+        self.assertEqual(self.add(self.dosa)['message'], 'Added the food to the cart')
+        self.assertEqual(self.add(self.dosa)['qty'], 2)
+        self.assertEqual(Cart.objects.get(user=self.customer).quantity, 2)
+
+    def test_unavailable_items_are_refused(self):
+        self.dosa.is_available = False
+        self.dosa.save()
+
+        response = self.add(self.dosa)
+
+        self.assertEqual(response, {'status': 'Failed', 'message': 'This food is not available right now!'})
+        self.assertFalse(Cart.objects.exists())
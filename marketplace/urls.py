@@ -1,14 +1,21 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from menu.api_views import MenuTreeAPIView
+
+from . import async_views, views
+
+# Under an ASGI server the cart AJAX endpoints can run as async views
+cart_views = async_views if settings.ASYNC_CART_VIEWS else views
 
 urlpatterns = [
     path("", views.marketplace, name="marketplace"),
     path("<slug:vendor_slug>/", views.vendor_detail, name="vendor_detail"),
+    path("<slug:vendor_slug>/menu/", MenuTreeAPIView.as_view(), name="vendor_menu_tree"),
     # ADD TO CART
-    path("add_to_cart/<int:food_id>/", views.add_to_cart, name="add_to_cart"),
+    path("add_to_cart/<int:food_id>/", cart_views.add_to_cart, name="add_to_cart"),
     # DECREASE CART
-    path("decrease_cart/<int:food_id>/", views.decrease_cart, name="decrease_cart"),
+    path("decrease_cart/<int:food_id>/", cart_views.decrease_cart, name="decrease_cart"),
     # DELETE CART ITEM
-    path("delete_cart/<int:cart_id>/", views.delete_cart, name="delete_cart"),
+    path("delete_cart/<int:cart_id>/", cart_views.delete_cart, name="delete_cart"),
 ]
@@ -1,9 +1,10 @@
 from django.contrib.auth.decorators import login_required
+from django.core.cache import caches
 from django.db.models import Prefetch
-from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, render
 
 from menu.models import Category, FoodItem
+from menu.stock import stock_levels
 from vendor.models import Vendor
 
 from .context_processors import get_cart_amounts, get_cart_counter
@@ -14,11 +15,23 @@ from django.views.generic import TemplateView
 from django.shortcuts import redirect
 from django.contrib.auth.mixins import LoginRequiredMixin
 from orders.forms import OrderForm
+from foodOnline_main.caching import cached, make_key
+from foodOnline_main.fastjson import FastJsonResponse
+from foodOnline_main.routers import use_replica
+from foodOnline_main.throttling import throttle
 
 
+@use_replica
 def marketplace(request):
-    vendors = Vendor.objects.filter(is_approved=True, user__is_active=True)
-    vendor_count = vendors.count()
+    vendors = cached(
+        "marketplace:vendors",
+        lambda: list(
+            Vendor.objects.filter(is_approved=True, user__is_active=True)
+            .select_related("user_profile")
+        ),
+        tags=["vendors"],
+    )
+    vendor_count = len(vendors)
     context = {
         "vendors": vendors,
         "vendor_count": vendor_count,
@@ -26,12 +39,35 @@ def marketplace(request):
     return render(request, "marketplace/listings.html", context)
 
 
+@use_replica
 def vendor_detail(request, vendor_slug):
-    vendor = get_object_or_404(Vendor, vendor_slug=vendor_slug)
+    vendor = cached(
+        make_key("vendor", vendor_slug),
+        lambda: get_object_or_404(
+            Vendor.objects.select_related("user", "user_profile"), vendor_slug=vendor_slug
+        ),
+        tags=["vendors"],
+    )
 
-    categories = Category.objects.filter(vendor=vendor).prefetch_related(
-        Prefetch("fooditems", queryset=FoodItem.objects.filter(is_available=True))
+    categories = cached(
+        make_key("vendor", vendor.id, "categories"),
+        lambda: list(
+            Category.objects.filter(vendor=vendor).prefetch_related(
+                Prefetch("fooditems", queryset=FoodItem.objects.available())
+            )
+        ),
+        # Kept until an item comes back or leaves its window
+        timeout=lambda categories: FoodItem.objects.filter(vendor=vendor).availability_timeout(
+            caches["menus"].default_timeout
+        ),
+        cache_alias="menus",
+        tags=[make_key("menu", vendor.id)],
     )
+    # Limited items show what is left, from a counter cached for a few seconds
+    stock = stock_levels(vendor)
+    for category in categories:
+        for food in category.fooditems.all():
+            food.stock_left = stock.get(food.id)
 
     if request.user.is_authenticated:
         cart_items = Cart.objects.filter(user=request.user)
@@ -45,19 +81,25 @@ def vendor_detail(request, vendor_slug):
     return render(request, "marketplace/vendor_detail.html", context)
 
 
+@throttle("cart", keys=("user",))
 def add_to_cart(request, food_id):
     if request.user.is_authenticated:
         if request.headers.get('x-requested-with') == 'XMLHttpRequest':
             # Check if the food item exists
             try:
                 fooditem = FoodItem.objects.get(id=food_id)
+                # Switched off, sold out or outside its window
+                if not FoodItem.objects.available().filter(pk=fooditem.pk).exists():
+                    return FastJsonResponse(
+                        {"status": "Failed", "message": "This food is not available right now!"}
+                    )
                 # Check if the user has already added that food to the cart
                 try:
                     chkCart = Cart.objects.get(user=request.user, fooditem=fooditem)
                     # Increase the cart quantity
                     chkCart.quantity += 1
                     chkCart.save()
-                    return JsonResponse(
+                    return FastJsonResponse(
                         {
                             "status": "Success",
                             "message": "Increased the cart quantity",
@@ -70,7 +112,7 @@ def add_to_cart(request, food_id):
                     chkCart = Cart.objects.create(
                         user=request.user, fooditem=fooditem, quantity=1
                     )
-                    return JsonResponse(
+                    return FastJsonResponse(
                         {
                             "status": "Success",
                             "message": "Added the food to the cart",
@@ -80,18 +122,19 @@ def add_to_cart(request, food_id):
                         }
                     )
             except:
-                return JsonResponse(
+                return FastJsonResponse(
                     {"status": "Failed", "message": "This food does not exist!"}
                 )
         else:
-            return JsonResponse({"status": "Failed", "message": "Invalid request!"})
+            return FastJsonResponse({"status": "Failed", "message": "Invalid request!"})
 
     else:
-        return JsonResponse(
+        return FastJsonResponse(
             {"status": "login_required", "message": "Please login to continue"}
         )
 
 
+@throttle("cart", keys=("user",))
 def decrease_cart(request, food_id):
     if request.user.is_authenticated:
         if request.headers.get('x-requested-with') == 'XMLHttpRequest':
@@ -108,7 +151,7 @@ def decrease_cart(request, food_id):
                     else:
                         chkCart.delete()
                         chkCart.quantity = 0
-                    return JsonResponse(
+                    return FastJsonResponse(
                         {
                             "status": "Success",
                             "cart_counter": get_cart_counter(request),
@@ -117,21 +160,21 @@ def decrease_cart(request, food_id):
                         }
                     )
                 except:
-                    return JsonResponse(
+                    return FastJsonResponse(
                         {
                             "status": "Failed",
                             "message": "You do not have this item in your cart!",
                         }
                     )
             except:
-                return JsonResponse(
+                return FastJsonResponse(
                     {"status": "Failed", "message": "This food does not exist!"}
                 )
         else:
-            return JsonResponse({"status": "Failed", "message": "Invalid request!"})
+            return FastJsonResponse({"status": "Failed", "message": "Invalid request!"})
 
     else:
-        return JsonResponse(
+        return FastJsonResponse(
             {"status": "login_required", "message": "Please login to continue"}
         )
 
@@ -145,6 +188,7 @@ def cart(request):
     return render(request, "marketplace/cart.html", context)
 
 
+@throttle("cart", keys=("user",))
 def delete_cart(request, cart_id):
     if request.user.is_authenticated:
         if request.headers.get('x-requested-with') == 'XMLHttpRequest':
@@ -153,7 +197,7 @@ def delete_cart(request, cart_id):
                 cart_item = Cart.objects.get(user=request.user, id=cart_id)
                 if cart_item:
                     cart_item.delete()
-                    return JsonResponse(
+                    return FastJsonResponse(
                         {
                             "status": "Success",
                             "message": "Cart item has been deleted!",
@@ -162,13 +206,14 @@ def delete_cart(request, cart_id):
                         }
                     )
             except:
-                return JsonResponse(
+                return FastJsonResponse(
                     {"status": "Failed", "message": "Cart Item does not exist!"}
                 )
         else:
-            return JsonResponse({"status": "Failed", "message": "Invalid request!"})
+            return FastJsonResponse({"status": "Failed", "message": "Invalid request!"})
 
 
+@use_replica
 def search(request):
     # Get search parameters from the request
     keyword = request.GET.get('keyword', '').strip()
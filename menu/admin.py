@@ -1,16 +1,25 @@
 from django.contrib import admin
 
-from .models import Category, FoodItem
+from .models import Category, FoodItem, StockShard
 
 
 class CategoryAdmin(admin.ModelAdmin):
-    prepopulated_fields = {"slug": ("category_name",)}
+    # Left to save(), which allocates a unique one from menu.slugs
+    readonly_fields = ("slug",)
     list_display = ("category_name", "vendor", "updated_at")
     search_fields = ("category_name", "vendor__vendor_name")
 
 
+class StockShardInline(admin.TabularInline):
+    model = StockShard
+    extra = 0
+    verbose_name_plural = "stock (none for unlimited)"
+
+
 class FoodItemAdmin(admin.ModelAdmin):
-    prepopulated_fields = {"slug": ("food_title",)}
+    inlines = [StockShardInline]
+    # Left to save(), which allocates a unique one from menu.slugs
+    readonly_fields = ("slug",)
     list_display = (
         "food_title",
         "category",
@@ -0,0 +1,57 @@
+import hashlib
+
+from django.core.cache import caches
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from rest_framework.permissions import AllowAny
+from rest_framework.views import APIView
+
+from foodOnline_main.caching import cached, make_key
+from foodOnline_main.fastjson import dumps
+from vendor.models import Vendor
+
+from .models import FoodItem
+from .tree import build_menu_tree
+
+
+class MenuTreeAPIView(APIView):
+    """
+    Public, read-only menu of a vendor: categories with their available items.
+    The encoded json is cached until the menu changes or an item's
+    availability does, and answers 304 to a matching ``If-None-Match``.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request, vendor_slug):
+        vendor = cached(
+            make_key("vendor", vendor_slug),
+            lambda: get_object_or_404(Vendor.objects.select_related("user", "user_profile"), vendor_slug=vendor_slug),
+            tags=["vendors"],
+        )
+        # Listed in the marketplace
+        if not (vendor.is_approved and vendor.user.is_active):
+            raise Http404
+
+        content, etag = cached(
+            make_key("api", "vendor", vendor.id, "menu-tree"),
+            lambda: self.encode(vendor),
+            timeout=lambda value: FoodItem.objects.filter(vendor=vendor).availability_timeout(
+                caches["menus"].default_timeout
+            ),
+            cache_alias="menus",
+            tags=[make_key("menu", vendor.id)],
+        )
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(content, content_type="application/json")
+        response["ETag"] = etag
+        return response
+
+    def encode(self, vendor):
+        content = dumps(
+            {"vendor": vendor.vendor_name, "vendor_slug": vendor.vendor_slug, "categories": build_menu_tree(vendor)}
+        )
+        return content, f'"{hashlib.sha256(content).hexdigest()[:32]}"'
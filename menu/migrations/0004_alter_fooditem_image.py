@@ -0,0 +1,19 @@
+# Generated by Django 4.2.15 on 2026-10-19 19:10
+
+from django.db import migrations, models
+import renditions.utils
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0003_alter_category_category_name'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='fooditem',
+            name='image',
+            field=models.ImageField(upload_to=renditions.utils.HashedUploadTo('foodimages', 'image')),
+        ),
+    ]
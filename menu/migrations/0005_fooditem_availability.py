@@ -0,0 +1,32 @@
+# Generated by Django 4.2.15 on 2026-10-19 19:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0004_alter_fooditem_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fooditem',
+            name='available_from',
+            field=models.TimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='fooditem',
+            name='available_until',
+            field=models.TimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='fooditem',
+            name='sold_out_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='fooditem',
+            constraint=models.CheckConstraint(check=models.Q(models.Q(('available_from__isnull', True), ('available_until__isnull', True)), models.Q(('available_from__isnull', False), ('available_until__isnull', False)), _connector='OR'), name='fooditem_window_complete'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.15 on 2026-10-19 19:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0005_fooditem_availability'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlugCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=100)),
+                ('base', models.SlugField(max_length=100)),
+                ('last', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='slugcounter',
+            constraint=models.UniqueConstraint(fields=('scope', 'base'), name='slugcounter_scope_base_unique'),
+        ),
+    ]
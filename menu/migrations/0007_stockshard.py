@@ -0,0 +1,27 @@
+# Generated by Django 4.2.15 on 2026-10-19 19:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0006_slugcounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField(default=0)),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('fooditem', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_shards', to='menu.fooditem')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='stockshard',
+            constraint=models.UniqueConstraint(fields=('fooditem', 'shard'), name='stockshard_fooditem_shard_unique'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.15 on 2026-10-19 20:02
+
+from django.db import migrations
+import renditions.utils
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0007_stockshard'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='fooditem',
+            name='image',
+            field=renditions.utils.HashedImageField(upload_to=renditions.utils.HashedUploadTo('foodimages', 'image')),
+        ),
+    ]
@@ -1,9 +1,30 @@
 from tabnanny import verbose
 
+import datetime
+import math
+
 from django.db import models
+from django.db.models import F, Q
+from django.utils import timezone
 
 from vendor.models import Vendor
-from django.utils.text import slugify
+
+from renditions.utils import HashedImageField, HashedUploadTo
+
+class SlugCounter(models.Model):
+    """Last suffix handed out for a base slug of a model, see menu.slugs."""
+    scope = models.CharField(max_length=100)
+    base = models.SlugField(max_length=100)
+    last = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "base"], name="slugcounter_scope_base_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.scope}:{self.base}"
+
 
 class Category(models.Model):
     vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE)
@@ -20,10 +41,75 @@ class Category(models.Model):
     def clean(self):
         self.category_name = self.category_name.capitalize()
 
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            from .slugs import allocate_slug
+
+            self.slug = allocate_slug(Category, self.category_name)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.category_name
 
 
+class FoodItemQuerySet(models.QuerySet):
+    def available(self, at=None):
+        """
+        Items that can be ordered at ``at`` (now by default): switched on, not
+        sold out and inside their daily window, all checked by the query itself.
+        """
+        at = at or timezone.now()
+        time = timezone.localtime(at).time()
+        in_window = (
+            Q(available_from__isnull=True)
+            | (Q(available_from__lte=F("available_until")) & Q(available_from__lte=time, available_until__gt=time))
+            # Windows going past midnight, e.g. 22:00 - 02:00
+            | (Q(available_from__gt=F("available_until")) & (Q(available_from__lte=time) | Q(available_until__gt=time)))
+        )
+        return self.filter(
+            Q(sold_out_until__isnull=True) | Q(sold_out_until__lte=at),
+            in_window,
+            is_available=True,
+        )
+
+    def next_availability_change(self, at=None):
+        """
+        The first moment after ``at`` when one of these items comes back or
+        leaves its window, ``None`` when none of them is scheduled.
+        """
+        at = at or timezone.now()
+        local = timezone.localtime(at)
+        changes = []
+        scheduled = self.filter(
+            Q(sold_out_until__gt=at) | Q(available_from__isnull=False)
+        ).values_list("sold_out_until", "available_from", "available_until")
+        for sold_out_until, available_from, available_until in scheduled:
+            if sold_out_until is not None and sold_out_until > at:
+                changes.append(sold_out_until)
+            for boundary in (available_from, available_until):
+                if boundary is None:
+                    continue
+                change = local.replace(
+                    hour=boundary.hour, minute=boundary.minute, second=boundary.second, microsecond=0
+                )
+                if change <= local:
+                    change += datetime.timedelta(days=1)
+                changes.append(change)
+        return min(changes, default=None)
+
+    def availability_timeout(self, default):
+        """
+        Seconds until ``next_availability_change()``, at most ``default``: how
+        long what ``available()`` returns now can be cached.
+        """
+        now = timezone.now()
+        change = self.next_availability_change(now)
+        if change is None:
+            return default
+        seconds = max(1, math.ceil((change - now).total_seconds()))
+        return seconds if default is None else min(default, seconds)
+
+
 class FoodItem(models.Model):
     vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE)
     category = models.ForeignKey(
@@ -33,15 +119,51 @@ class FoodItem(models.Model):
     slug = models.SlugField(max_length=100, unique=True)
     description = models.TextField(max_length=250, blank=True)
     price = models.DecimalField(max_digits=10, decimal_places=2)
-    image = models.ImageField(upload_to="foodimages")
+    image = HashedImageField(upload_to=HashedUploadTo("foodimages", "image"))
     is_available = models.BooleanField(default=True)
+    # Out of stock until then, the item comes back by itself
+    sold_out_until = models.DateTimeField(null=True, blank=True)
+    # Daily window, in TIME_ZONE, during which the item is served, e.g. breakfast from 07:00 to 11:00
+    available_from = models.TimeField(null=True, blank=True)
+    available_until = models.TimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = FoodItemQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                check=Q(available_from__isnull=True, available_until__isnull=True)
+                | Q(available_from__isnull=False, available_until__isnull=False),
+                name="fooditem_window_complete",
+            ),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify(self.food_title)
+            from .slugs import allocate_slug
+
+            self.slug = allocate_slug(FoodItem, self.food_title)
         super().save(*args, **kwargs)
 
     def __str__(self):
         return self.food_title
+
+
+class StockShard(models.Model):
+    """
+    Part of the stock left of a limited item, see menu.stock. Items without
+    shards are unlimited.
+    """
+    fooditem = models.ForeignKey(FoodItem, on_delete=models.CASCADE, related_name="stock_shards")
+    shard = models.PositiveSmallIntegerField(default=0)
+    quantity = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["fooditem", "shard"], name="stockshard_fooditem_shard_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.fooditem_id}:{self.shard}"
@@ -1,16 +1,22 @@
 from rest_framework import serializers
 
+from accounts.serializers import ValidatedImageField
+from renditions.fields import RenditionsField
+
 from .models import Category, FoodItem
 
 
-class FoodItemSerializer(serializers.ModelSerializer):
+class CategoryFoodItemSerializer(serializers.ModelSerializer):
+    """Items nested in CategorySerializer, prefetch ``fooditems`` when serializing several categories."""
+    image_renditions = RenditionsField(source="image")
+
     class Meta:
         model = FoodItem
-        fields = ["food_title", "slug", "description", "price", "image", "is_available"]
+        fields = ["food_title", "slug", "description", "price", "image", "image_renditions", "is_available"]
 
 
 class CategorySerializer(serializers.ModelSerializer):
-    fooditems = FoodItemSerializer(many=True, read_only=True)
+    fooditems = CategoryFoodItemSerializer(many=True, read_only=True)
 
     class Meta:
         model = Category
@@ -20,9 +26,42 @@ class CategorySerializer(serializers.ModelSerializer):
 class FoodItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = FoodItem
-        fields = ['id', 'vendor', 'category', 'food_title', 'slug', 'description', 'price', 'image', 'is_available']
+        fields = ['id', 'vendor', 'category', 'food_title', 'slug', 'description', 'price', 'image', 'image_renditions', 'is_available']
         read_only_fields = ['vendor', 'slug']
 
     # Make category and image optional
     category = serializers.PrimaryKeyRelatedField(queryset=Category.objects.all(), required=False)
-    image = serializers.ImageField(required=False, allow_null=True)
+    image = ValidatedImageField(required=False, allow_null=True)
+    image_renditions = RenditionsField(source="image")
+
+
+class AvailabilitySerializer(serializers.Serializer):
+    """
+    A bulk availability change: the items, by ``ids`` or ``category`` slug,
+    and the fields to set on all of them.
+    """
+
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    category = serializers.SlugField(required=False)
+    is_available = serializers.BooleanField(required=False)
+    sold_out_until = serializers.DateTimeField(required=False, allow_null=True)
+    available_from = serializers.TimeField(required=False, allow_null=True)
+    available_until = serializers.TimeField(required=False, allow_null=True)
+
+    CHANGES = ("is_available", "sold_out_until", "available_from", "available_until")
+
+    def validate(self, attrs):
+        if ("ids" in attrs) == ("category" in attrs):
+            raise serializers.ValidationError("Give either ids or a category.")
+        if not any(field in attrs for field in self.CHANGES):
+            raise serializers.ValidationError(f"Nothing to change, set one of {', '.join(self.CHANGES)}.")
+        if ("available_from" in attrs) != ("available_until" in attrs):
+            raise serializers.ValidationError("available_from and available_until go together.")
+        if (attrs.get("available_from") is None) != (attrs.get("available_until") is None):
+            raise serializers.ValidationError("Give both ends of the window, or null for both.")
+        if attrs.get("available_from") is not None and attrs["available_from"] == attrs["available_until"]:
+            raise serializers.ValidationError("The window can't be empty.")
+        return attrs
+
+    def changes(self):
+        return {field: self.validated_data[field] for field in self.CHANGES if field in self.validated_data}
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from foodOnline_main.caching import invalidate_tags, make_key
+
+from .models import Category, FoodItem, StockShard
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=FoodItem)
+@receiver(post_delete, sender=FoodItem)
+def menu_changed_receiver(sender, instance, **kwargs):
+    invalidate_tags(make_key("menu", instance.vendor_id))
+
+
+@receiver(post_save, sender=StockShard)
+@receiver(post_delete, sender=StockShard)
+def stock_changed_receiver(sender, instance, **kwargs):
+    invalidate_tags(make_key("stock", instance.fooditem.vendor_id))
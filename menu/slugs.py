@@ -0,0 +1,111 @@
+"""
+Unique slugs for menu objects: "paneer-tikka", then "paneer-tikka-2", ...
+
+Each (model, base slug) pair has a SlugCounter row holding the last suffix
+handed out. Allocating is one atomic UPDATE of that row, so concurrent
+requests never get the same slug and never need to retry on IntegrityError.
+The first allocation of a base seeds its counter from the slugs already in
+the table, with a single prefix query on the slug's unique index.
+"""
+import re
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils.text import slugify
+
+from .models import SlugCounter
+
+# Room kept at the end of the slug for "-<suffix>"
+SUFFIX_LENGTH = 11
+# "paneer-2" as a bare slug would also be suffix 2 of "paneer", such bases always get a suffix
+NUMBERED = re.compile(r"-\d+$")
+
+
+def base_slug(model, title):
+    max_length = model._meta.get_field("slug").max_length - SUFFIX_LENGTH
+    return slugify(title)[:max_length].strip("-") or model._meta.model_name
+
+
+def slug_suffix(slug, base):
+    """Suffix of ``slug`` as allocated from ``base``: 1 for the base itself, ``None`` when it isn't one of its slugs."""
+    if slug == base:
+        return 1
+    head, _, suffix = slug.rpartition("-")
+    if head == base and suffix.isdigit():
+        return int(suffix)
+    return None
+
+
+def existing_suffixes(model, bases):
+    """Highest suffix already used by each of ``bases``, found with one prefix query."""
+    condition = Q()
+    for base in bases:
+        condition |= Q(slug__startswith=base)
+    highest = {base: 1 if NUMBERED.search(base) else 0 for base in bases}
+    for slug in model._default_manager.filter(condition).values_list("slug", flat=True):
+        for base in bases:
+            suffix = slug_suffix(slug, base)
+            if suffix is not None and suffix > highest[base]:
+                highest[base] = suffix
+    return highest
+
+
+def reserve(scope, base, count):
+    """Take ``count`` suffixes from an existing counter, return the first one or ``None`` without a counter."""
+    counters = SlugCounter.objects.filter(scope=scope, base=base)
+    # The UPDATE locks the row until the transaction ends, the read after it sees our own increment
+    if not counters.update(last=F("last") + count):
+        return None
+    return counters.values_list("last", flat=True).get() - count + 1
+
+
+def allocate(model, counts):
+    """``{base: count}`` -> ``{base: [count unique slugs]}`` for ``model``."""
+    scope = model._meta.label_lower
+    firsts = {}
+    with transaction.atomic():
+        for base, count in counts.items():
+            firsts[base] = reserve(scope, base, count)
+
+        missing = [base for base, first in firsts.items() if first is None]
+        if missing:
+            for base, highest in existing_suffixes(model, missing).items():
+                try:
+                    with transaction.atomic():
+                        SlugCounter.objects.create(scope=scope, base=base, last=highest + counts[base])
+                    firsts[base] = highest + 1
+                except IntegrityError:
+                    # Someone else seeded it meanwhile
+                    firsts[base] = reserve(scope, base, counts[base])
+
+    return {
+        base: [base if suffix == 1 else f"{base}-{suffix}" for suffix in range(first, first + counts[base])]
+        for base, first in firsts.items()
+    }
+
+
+def allocate_slug(model, title, current=None):
+    """
+    A unique slug for ``title``. ``current`` is kept when it was already made
+    from the same title, so renaming to the same slug doesn't bump the suffix.
+    """
+    base = base_slug(model, title)
+    if current and slug_suffix(current, base) is not None:
+        return current
+    return allocate(model, {base: 1})[base][0]
+
+
+def assign_slugs(objs, title_field):
+    """
+    Set a unique slug on every object of ``objs`` without one, before a
+    ``bulk_create``. Needs one counter UPDATE per distinct title.
+    """
+    objs = [obj for obj in objs if not obj.slug]
+    if not objs:
+        return
+    model = type(objs[0])
+    bases = [base_slug(model, getattr(obj, title_field)) for obj in objs]
+    slugs = allocate(model, Counter(bases))
+    for obj, base in zip(objs, bases):
+        obj.slug = slugs[base].pop(0)
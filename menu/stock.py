@@ -0,0 +1,145 @@
+"""
+Stock of limited menu items.
+
+An item is limited when it has StockShard rows, what is left is the sum of
+their quantities. Taking stock is a conditional UPDATE of one shard,
+"quantity = quantity - n WHERE quantity >= n": concurrent orders never
+oversell and never wait on a SELECT ... FOR UPDATE, only on the row lock of
+the UPDATE itself. Items many people order at once get several shards, so
+their orders lock different rows.
+"""
+import random
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from foodOnline_main.caching import cached, invalidate_tags, make_key
+
+from .models import FoodItem, StockShard
+
+
+class OutOfStock(Exception):
+    """Raised with ``{fooditem_id: food_title}`` of the items short of stock."""
+
+    def __init__(self, items):
+        self.items = items
+        super().__init__(f"Sold out: {', '.join(items.values())}.")
+
+
+def set_stock(fooditem, quantity, shards=1):
+    """
+    Limit ``fooditem`` to ``quantity`` more portions, spread over ``shards``
+    counters, or make it unlimited again with ``None``. Portions held by
+    checkouts in progress are not part of ``quantity``.
+    """
+    with transaction.atomic():
+        StockShard.objects.filter(fooditem=fooditem).delete()
+        if quantity is not None:
+            per_shard, extra = divmod(quantity, shards)
+            StockShard.objects.bulk_create([
+                StockShard(fooditem=fooditem, shard=n, quantity=per_shard + (n < extra)) for n in range(shards)
+            ])
+    invalidate_tags(make_key("stock", fooditem.vendor_id))
+
+
+def take_from_shards(fooditem_id, shards, quantity):
+    """Take ``quantity`` of an item from its ``{shard: quantity seen}``, False when not enough is left."""
+    counters = StockShard.objects.filter(fooditem_id=fooditem_id)
+    # The whole quantity from a single shard, starting at a random one so concurrent orders spread out
+    candidates = [shard for shard, left in shards.items() if left >= quantity]
+    random.shuffle(candidates)
+    for shard in candidates:
+        if counters.filter(shard=shard, quantity__gte=quantity).update(quantity=F("quantity") - quantity):
+            return True
+
+    # Near the end what is left is spread over the shards, drain them one after the other. A shard
+    # that changed since it was seen is skipped: the order may be refused while a portion is left,
+    # never accepted without one.
+    missing = quantity
+    for shard, left in shards.items():
+        part = min(left, missing)
+        if not part:
+            continue
+        if counters.filter(shard=shard, quantity__gte=part).update(quantity=F("quantity") - part):
+            missing -= part
+            if not missing:
+                return True
+    return False
+
+
+def take(quantities):
+    """
+    Take ``{fooditem_id: quantity}`` from the stock of the limited items among
+    them, all or nothing, and return the ``{fooditem_id: quantity}`` taken.
+    Unlimited items are left out. Raises OutOfStock when one is short.
+    """
+    shards = defaultdict(dict)
+    titles, vendors = {}, {}
+    rows = StockShard.objects.filter(fooditem_id__in=quantities).values_list(
+        "fooditem_id", "fooditem__food_title", "fooditem__vendor_id", "shard", "quantity"
+    )
+    for fooditem_id, title, vendor_id, shard, left in rows:
+        shards[fooditem_id][shard] = left
+        titles[fooditem_id], vendors[fooditem_id] = title, vendor_id
+
+    with transaction.atomic():
+        short = {
+            fooditem_id: titles[fooditem_id]
+            for fooditem_id, item_shards in shards.items()
+            if not take_from_shards(fooditem_id, item_shards, quantities[fooditem_id])
+        }
+        if short:
+            # Menus still showing some of these left are out of date
+            invalidate_tags(*{make_key("stock", vendors[fooditem_id]) for fooditem_id in short})
+            raise OutOfStock(short)
+    return {fooditem_id: quantities[fooditem_id] for fooditem_id in shards}
+
+
+def put_back(quantities):
+    """Return ``{fooditem_id: quantity}`` to the stock of the items that are still limited."""
+    shards = defaultdict(list)
+    for fooditem_id, shard in StockShard.objects.filter(fooditem_id__in=quantities).values_list("fooditem_id", "shard"):
+        shards[fooditem_id].append(shard)
+    for fooditem_id, item_shards in shards.items():
+        StockShard.objects.filter(fooditem_id=fooditem_id, shard=random.choice(item_shards)).update(
+            quantity=F("quantity") + quantities[fooditem_id]
+        )
+
+
+def stock_levels(vendor):
+    """
+    ``{fooditem_id: quantity left}`` of the vendor's limited items, as of at
+    most STOCK_CACHE_SECONDS ago. Portions held by expired checkout
+    reservations are counted as left, ordering them releases the reservations
+    first (orders.reservations).
+    """
+
+    def levels():
+        left = dict(
+            StockShard.objects.filter(fooditem__vendor=vendor)
+            .values("fooditem")
+            .annotate(left=Sum("quantity"))
+            .values_list("fooditem", "left")
+        )
+        # StockReservation rows of the vendor's items past their expiry
+        expired = (
+            FoodItem.objects.filter(
+                vendor=vendor, pk__in=list(left), stockreservation__expires_at__lte=timezone.now()
+            )
+            .annotate(held=Sum("stockreservation__quantity"))
+            .values_list("pk", "held")
+        )
+        for fooditem_id, held in expired:
+            left[fooditem_id] += held
+        return left
+
+    return cached(
+        make_key("vendor", vendor.id, "stock"),
+        levels,
+        timeout=settings.STOCK_CACHE_SECONDS,
+        cache_alias="menus",
+        tags=[make_key("stock", vendor.id)],
+    )
@@ -1,3 +1,307 @@
-from django.test import TestCase
+import datetime
+import threading
+import unittest
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from orders.tests import create_vendor
+
+from .models import Category, FoodItem, StockShard
+from .slugs import assign_slugs
+from .stock import OutOfStock, put_back, set_stock, stock_levels, take
+from .tree import build_menu_tree
+
+
+def new_item(category, title):
+    return FoodItem(
+        vendor=category.vendor, category=category, food_title=title, price='5.00', image='foodimages/food.jpg'
+    )
+
+
+def run_in_threads(count, work):
+    """Run ``work(n)`` in ``count`` threads started together, return their results or raise their first error."""
+    barrier = threading.Barrier(count)
+    results, errors = [None] * count, []
+
+    def run(n):
+        try:
+            barrier.wait()
+            results[n] = work(n)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=run, args=(n,)) for n in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return results
+
+
+def local(hour, minute=0, day=1):
+    return timezone.make_aware(datetime.datetime(2026, 3, day, hour, minute))
+
+
+class AvailabilityTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(vendor=create_vendor('dosacorner'), category_name='Mains')
+
+    def item(self, title, **fields):
+        item = new_item(self.category, title)
+        for name, value in fields.items():
+            setattr(item, name, value)
+        item.save()
+        return item
+
+    def available_at(self, at):
+        return set(FoodItem.objects.available(at).values_list('food_title', flat=True))
+
+    def test_switched_off_and_sold_out_items(self):
+        self.item('Dosa')
+        self.item('Idli', is_available=False)
+        self.item('Vada', sold_out_until=local(12))
+
+        self.assertEqual(self.available_at(local(11)), {'Dosa'})
+        self.assertEqual(self.available_at(local(12)), {'Dosa', 'Vada'})
+
+    def test_daily_windows(self):
+        self.item('Breakfast', available_from=datetime.time(7), available_until=datetime.time(11))
+        # Past midnight
+        self.item('Late night', available_from=datetime.time(22), available_until=datetime.time(2))
+
+        self.assertEqual(self.available_at(local(6, 59)), set())
+        self.assertEqual(self.available_at(local(7)), {'Breakfast'})
+        self.assertEqual(self.available_at(local(11)), set())
+        self.assertEqual(self.available_at(local(23)), {'Late night'})
+        self.assertEqual(self.available_at(local(1, 59, day=2)), {'Late night'})
+        self.assertEqual(self.available_at(local(2, day=2)), set())
+
+    def test_next_availability_change(self):
+        self.item('Breakfast', available_from=datetime.time(7), available_until=datetime.time(11))
+        self.item('Vada', sold_out_until=local(9))
+        items = FoodItem.objects.all()
+
+        self.assertEqual(items.next_availability_change(local(6)), local(7))
+        self.assertEqual(items.next_availability_change(local(8)), local(9))
+        self.assertEqual(items.next_availability_change(local(12)), local(7, day=2))
+        self.assertIsNone(FoodItem.objects.filter(food_title='Dosa').next_availability_change(local(6)))
+
+
+class MenuTreeTests(TestCase):
+    def setUp(self):
+        for alias in caches:
+            caches[alias].clear()
+        self.vendor = create_vendor('dosacorner')
+        mains = Category.objects.create(vendor=self.vendor, category_name='Mains')
+        Category.objects.create(vendor=self.vendor, category_name='Drinks')
+        for n in range(5):
+            new_item(mains, f'Dosa {n}').save()
+        off = new_item(mains, 'Uttapam')
+        off.is_available = False
+        off.save()
+
+    def get(self, **headers):
+        return self.client.get(reverse('vendor_menu_tree', args=[self.vendor.vendor_slug]), **headers)
+
+    def test_categories_with_their_available_items(self):
+        with self.assertNumQueries(2):
+            tree = build_menu_tree(self.vendor)
+
+        self.assertEqual([category['category_name'] for category in tree], ['Mains', 'Drinks'])
+        self.assertEqual([item['food_title'] for item in tree[0]['fooditems']], [f'Dosa {n}' for n in range(5)])
+        self.assertEqual(tree[0]['fooditems'][0]['price'], '5.00')
+        self.assertEqual(tree[1]['fooditems'], [])
+
+    def test_served_with_an_etag(self):
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['vendor_slug'], 'dosacorner')
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_unlisted_vendors_have_no_menu(self):
+        self.vendor.is_approved = False
+        self.vendor.save()
+        self.assertEqual(self.get().status_code, 404)
+
+        self.vendor.is_approved = True
+        self.vendor.save()
+        self.vendor.user.is_active = False
+        self.vendor.user.save()
+        self.assertEqual(self.get().status_code, 404)
+
+
+class StockTests(TestCase):
+    def setUp(self):
+        for alias in caches:
+            caches[alias].clear()
+        self.vendor = create_vendor('dosacorner')
+        self.category = Category.objects.create(vendor=self.vendor, category_name='Mains')
+        self.dosa = new_item(self.category, 'Dosa')
+        self.dosa.save()
+        self.idli = new_item(self.category, 'Idli')
+        self.idli.save()
+
+    def left(self, fooditem):
+        return sum(StockShard.objects.filter(fooditem=fooditem).values_list('quantity', flat=True))
+
+    def test_set_stock_spreads_it_over_shards(self):
+        set_stock(self.dosa, 10, shards=3)
+
+        self.assertEqual(
+            sorted(StockShard.objects.filter(fooditem=self.dosa).values_list('quantity', flat=True)), [3, 3, 4]
+        )
+        set_stock(self.dosa, None)
+        self.assertFalse(StockShard.objects.filter(fooditem=self.dosa).exists())
+
+    def test_takes_limited_items_and_leaves_unlimited_ones_out(self):
+        set_stock(self.dosa, 5)
+
+        taken = take({self.dosa.pk: 2, self.idli.pk: 7})
+
+        self.assertEqual(taken, {self.dosa.pk: 2})
+        self.assertEqual(self.left(self.dosa), 3)
+
+    def test_drains_several_shards_near_the_end(self):
+        set_stock(self.dosa, 4, shards=4)
+
+        take({self.dosa.pk: 3})
+
+        self.assertEqual(self.left(self.dosa), 1)
+        self.assertTrue(all(left >= 0 for left in StockShard.objects.values_list('quantity', flat=True)))
+
+    def test_all_or_nothing(self):
+        set_stock(self.dosa, 5)
+        set_stock(self.idli, 1)
+
+        with self.assertRaises(OutOfStock) as raised:
+            take({self.dosa.pk: 2, self.idli.pk: 2})
+
+        self.assertEqual(raised.exception.items, {self.idli.pk: 'Idli'})
+        self.assertEqual((self.left(self.dosa), self.left(self.idli)), (5, 1))
+
+    def test_put_back(self):
+        set_stock(self.dosa, 5, shards=2)
+        take({self.dosa.pk: 4})
+
+        put_back({self.dosa.pk: 3, self.idli.pk: 1})
+
+        self.assertEqual(self.left(self.dosa), 4)
+        self.assertFalse(StockShard.objects.filter(fooditem=self.idli).exists())
+
+    def test_stock_levels(self):
+        set_stock(self.dosa, 5, shards=2)
+        take({self.dosa.pk: 2})
+
+        self.assertEqual(stock_levels(self.vendor), {self.dosa.pk: 3})
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'The in-memory SQLite test database refuses concurrent writers')
+@mock.patch('renditions.signals.schedule_renditions', mock.Mock())
+class ConcurrentStockTests(TransactionTestCase):
+    def test_sells_exactly_the_stock(self):
+        category = Category.objects.create(vendor=create_vendor('dosacorner'), category_name='Mains')
+        dosa = new_item(category, 'Dosa')
+        dosa.save()
+        set_stock(dosa, 100, shards=4)
+
+        def work(n):
+            sold = 0
+            while True:
+                try:
+                    take({dosa.pk: 3})
+                except OutOfStock:
+                    return sold
+                sold += 3
+
+        sold = sum(run_in_threads(8, work))
+
+        shards = list(StockShard.objects.filter(fooditem=dosa).values_list('quantity', flat=True))
+        # Never oversold, nothing lost. An order may be refused while a shard changes under it, not accepted without stock
+        self.assertTrue(all(left >= 0 for left in shards))
+        self.assertEqual(sold + sum(shards), 100)
+
+
+class SlugTests(TestCase):
+    def setUp(self):
+        self.vendor = create_vendor('dosacorner')
+        self.category = Category.objects.create(vendor=self.vendor, category_name='Mains')
+
+    def test_same_titles_get_numbered_slugs(self):
+        items = [new_item(self.category, 'Paneer Tikka') for _ in range(3)]
+        for item in items:
+            item.save()
+
+        self.assertEqual([item.slug for item in items], ['paneer-tikka', 'paneer-tikka-2', 'paneer-tikka-3'])
+
+    def test_bulk_assignment_continues_after_saved_items(self):
+        new_item(self.category, 'Dosa').save()
+        items = [new_item(self.category, 'Dosa') for _ in range(2)] + [new_item(self.category, 'Idli')]
+
+        assign_slugs(items, 'food_title')
+        FoodItem.objects.bulk_create(items)
+
+        self.assertEqual([item.slug for item in items], ['dosa-2', 'dosa-3', 'idli'])
+
+    def test_counter_starts_after_existing_slugs(self):
+        # Slugs made before the counters existed
+        for slug in ['vada', 'vada-7']:
+            item = new_item(self.category, 'Vada')
+            item.slug = slug
+            item.save()
+
+        item = new_item(self.category, 'Vada')
+        item.save()
+
+        self.assertEqual(item.slug, 'vada-8')
+
+    def test_numbered_titles_always_get_a_suffix(self):
+        first = Category.objects.create(vendor=self.vendor, category_name='Combo 2')
+        plain = Category.objects.create(vendor=self.vendor, category_name='Combo')
+
+        self.assertEqual(first.slug, 'combo-2-2')
+        self.assertEqual(plain.slug, 'combo')
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'The in-memory SQLite test database refuses concurrent writers')
+# The test images don't exist, and committed saves would queue their renditions
+@mock.patch('renditions.signals.schedule_renditions', mock.Mock())
+class ConcurrentSlugTests(TransactionTestCase):
+    def setUp(self):
+        self.category = Category.objects.create(vendor=create_vendor('dosacorner'), category_name='Mains')
+
+    def test_concurrent_saves_get_unique_slugs(self):
+        def work(n):
+            for _ in range(10):
+                new_item(self.category, 'Paneer Tikka').save()
+
+        run_in_threads(8, work)
+
+        slugs = list(FoodItem.objects.values_list('slug', flat=True))
+        self.assertEqual(len(slugs), 80)
+        self.assertEqual(len(set(slugs)), 80)
+
+    def test_concurrent_bulk_creates_and_saves_get_unique_slugs(self):
+        def work(n):
+            if n % 2:
+                items = [new_item(self.category, 'Paneer Tikka') for _ in range(10)]
+                assign_slugs(items, 'food_title')
+                FoodItem.objects.bulk_create(items)
+            else:
+                for _ in range(10):
+                    new_item(self.category, 'Paneer Tikka').save()
+
+        run_in_threads(8, work)
+
+        slugs = list(FoodItem.objects.values_list('slug', flat=True))
+        self.assertEqual(len(slugs), 80)
+        self.assertEqual(len(set(slugs)), 80)
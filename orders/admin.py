@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Payment, Order, OrderedFood
+from .events import ORDER_UPDATED, publish_order_event
+from .models import Payment, Order, OrderedFood, OrderTax
 
 
 class OrderedFoodInline(admin.TabularInline):
@@ -8,9 +9,26 @@ class OrderedFoodInline(admin.TabularInline):
     extra = 0
 
 
+class OrderTaxInline(admin.TabularInline):
+    model = OrderTax
+    readonly_fields = ('tax_type', 'percentage', 'amount', 'created_at')
+    can_delete = False
+    extra = 0
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 class OrderAdmin(admin.ModelAdmin):
     list_display = ['order_number', 'name', 'phone', 'email', 'total', 'payment_method', 'status', 'is_ordered', 'vendor']
-    inlines = [OrderedFoodInline]
+    inlines = [OrderedFoodInline, OrderTaxInline]
+    # Changed by the vendor through orders.lifecycle, which checks the transition and logs it
+    readonly_fields = ['status']
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and obj.is_ordered:
+            publish_order_event(obj, ORDER_UPDATED)
 
 
 admin.site.register(Payment)
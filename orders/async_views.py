@@ -0,0 +1,60 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponseForbidden, StreamingHttpResponse
+
+from foodOnline_main.broker import get_broker
+from vendor.models import Vendor
+
+from .events import vendor_channel
+
+HEARTBEAT_INTERVAL = 15
+
+
+@sync_to_async
+def get_vendor_id(request):
+    if not request.user.is_authenticated:
+        return None
+    return Vendor.objects.filter(user=request.user).values_list('id', flat=True).first()
+
+
+async def event_stream(channel, max_seconds):
+    """
+    Messages of ``channel`` for ``max_seconds``, then the stream ends and
+    EventSource reconnects. A disconnected client isn't always noticed, this
+    bounds how long its subscription lives.
+    """
+    subscription = await get_broker().subscribe(channel)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_seconds
+    try:
+        # Ask EventSource to reconnect quickly after a dropped connection
+        yield 'retry: 3000\n\n'
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            message = await subscription.get(min(HEARTBEAT_INTERVAL, remaining))
+            if message is None:
+                # Comment line, keeps proxies from closing an idle connection
+                yield ': keepalive\n\n'
+            else:
+                yield f"event: {message['event']}\ndata: {json.dumps(message)}\n\n"
+    finally:
+        await subscription.close()
+
+
+async def vendor_order_events(request):
+    """Server-sent events for the new and updated orders of the logged in vendor."""
+    vendor_id = await get_vendor_id(request)
+    if vendor_id is None:
+        return HttpResponseForbidden()
+
+    stream = event_stream(vendor_channel(vendor_id), settings.ORDER_EVENTS_MAX_SECONDS)
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Don't let nginx buffer the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
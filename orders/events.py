@@ -0,0 +1,46 @@
+from django.db import transaction
+from django.urls import reverse
+
+from foodOnline_main.broker import publish
+from foodOnline_main.caching import make_key
+
+ORDER_CREATED = 'order.created'
+ORDER_UPDATED = 'order.updated'
+
+
+def vendor_channel(vendor_id):
+    return make_key('orders', 'vendor', vendor_id)
+
+
+def order_vendor_ids(order):
+    vendor_ids = {int(vendor_id) for vendor_id in order.vendor_totals if vendor_id != 'None'}
+    if order.vendor_id:
+        vendor_ids.add(order.vendor_id)
+    return vendor_ids
+
+
+def publish_order_event(order, event):
+    """
+    Tell the vendor owning ``order`` about it, once the transaction commits.
+    Like its order list (Order.objects.owned_by_vendor_user), the stream leaves
+    out orders a vendor only has some lines in.
+    """
+
+    def send():
+        if order.vendor_id is None:
+            return
+        publish(vendor_channel(order.vendor_id), {
+            'event': event,
+            'id': order.pk,
+            'order_number': order.order_number,
+            'status': order.status,
+            'name': order.name,
+            'item_summary': order.item_summary,
+            # As the order list shows it
+            'total': order.total,
+            'created_at': order.created_at,
+            'updated_at': order.updated_at,
+            'url': reverse('vendor_order_detail_json', args=[order.pk]),
+        })
+
+    transaction.on_commit(send)
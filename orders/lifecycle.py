@@ -0,0 +1,59 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .events import ORDER_UPDATED, order_vendor_ids, publish_order_event
+from .models import Order, OrderStatusEvent
+
+
+class InvalidTransition(Exception):
+    pass
+
+
+def sources_of(status):
+    """Statuses an order can move to ``status`` from."""
+    return [source for source, targets in Order.TRANSITIONS.items() if status in targets]
+
+
+def transition_orders(orders, status, user=None):
+    """
+    Move every order of the ``orders`` queryset that may go to ``status``
+    there, with one UPDATE and one INSERT into the status log whatever the
+    number of orders. Returns ``(moved, skipped)`` lists of order ids, skipped
+    ones being in a status that can't move to ``status``. With a ``user``
+    only the orders of the vendor it owns are considered, vendors that merely
+    have lines in an order can't change it.
+    """
+    if status not in Order.TRANSITIONS:
+        raise InvalidTransition(f'Unknown order status "{status}".')
+    if user is not None:
+        orders = orders.owned_by_vendor_user(user)
+
+    with transaction.atomic():
+        candidates = list(
+            # Only the order rows, callers' querysets may join vendors or lines
+            orders.select_for_update(of=('self',)).only(
+                'pk', 'status', 'vendor_id', 'order_number', 'first_name', 'last_name',
+                'item_summary', 'vendor_totals', 'created_at', 'updated_at',
+            )
+        )
+        sources = sources_of(status)
+        moving = [order for order in candidates if order.status in sources]
+        if moving:
+            now = timezone.now()
+            Order.objects.filter(pk__in=[order.pk for order in moving]).update(status=status, updated_at=now)
+            OrderStatusEvent.objects.bulk_create([
+                OrderStatusEvent(
+                    order_id=order.pk, vendor_id=vendor_id, user=user,
+                    from_status=order.status, to_status=status,
+                )
+                for order in moving
+                # One per vendor with lines in the order, each lists its own changes
+                for vendor_id in order_vendor_ids(order)
+            ])
+            for order in moving:
+                order.status, order.updated_at = status, now
+                publish_order_event(order, ORDER_UPDATED)
+
+    moved = {order.pk for order in moving}
+    return [order.pk for order in moving], [order.pk for order in candidates if order.pk not in moved]
+
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from orders.reservations import release_expired
+
+
+class Command(BaseCommand):
+    help = "Put the stock held by expired checkout reservations back, to run every few minutes."
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{release_expired()} expired reservations released")
@@ -0,0 +1,33 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from orders.models import OrderTax
+
+
+def parse_month(value):
+    try:
+        month = datetime.datetime.strptime(value, "%Y-%m")
+    except ValueError:
+        raise CommandError(f'"{value}" is not a YYYY-MM month.')
+    return timezone.make_aware(month)
+
+
+class Command(BaseCommand):
+    help = "Tax collected on paid orders per month, tax type and percentage, from the OrderTax lines."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="start", metavar="YYYY-MM", help="First month of the report")
+        parser.add_argument("--to", dest="end", metavar="YYYY-MM", help="Month after the last one of the report")
+
+    def handle(self, *args, **options):
+        start = parse_month(options["start"]) if options["start"] else None
+        end = parse_month(options["end"]) if options["end"] else None
+
+        self.stdout.write(f"{'month':<8} {'tax':<20} {'%':>6} {'orders':>7} {'amount':>12}")
+        for row in OrderTax.objects.monthly_report(start, end):
+            self.stdout.write(
+                f"{row['month']:%Y-%m}  {row['tax_type']:<20} {row['percentage']:>6} "
+                f"{row['orders']:>7} {row['amount']:>12}"
+            )
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.15 on 2026-10-19 19:23
+
+from django.db import migrations, models
+
+
+def summarize_items(ordered_items, max_length=255):
+    # orders.utils.summarize_items as of this migration
+    item_count = sum(item.quantity for item in ordered_items)
+    summary = ', '.join(f'{item.quantity} x {item.fooditem.food_title}' for item in ordered_items)
+    if len(summary) > max_length:
+        summary = summary[:max_length - 3].rsplit(',', 1)[0] + '...'
+    return item_count, summary
+
+
+def backfill_item_summary(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    OrderedFood = apps.get_model('orders', 'OrderedFood')
+    lines = {}
+    for item in OrderedFood.objects.select_related('fooditem').order_by('order_id', 'id').iterator():
+        lines.setdefault(item.order_id, []).append(item)
+    orders = list(Order.objects.filter(pk__in=lines).only('pk'))
+    for order in orders:
+        order.item_count, order.item_summary = summarize_items(lines[order.pk])
+    Order.objects.bulk_update(orders, ['item_count', 'item_summary'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_order_vendor_orderedfood_vendor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='item_summary',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', 'is_ordered', '-created_at', '-id'], name='order_user_history_idx'),
+        ),
+        migrations.RunPython(backfill_item_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.15 on 2026-10-19 19:24
+
+import json
+
+from django.db import migrations, models
+
+
+def compute_vendor_totals(ordered_items, tax_data):
+    # orders.utils.compute_vendor_totals as of this migration, with the float amounts of the time
+    subtotals = {}
+    for item in ordered_items:
+        key = str(item.vendor_id)
+        subtotals[key] = subtotals.get(key, 0) + float(item.amount)
+
+    vendor_totals = {}
+    for key, subtotal in subtotals.items():
+        vendor_tax_data = {
+            tax_type: {percentage: round(float(percentage) * subtotal / 100, 2) for percentage in rates}
+            for tax_type, rates in tax_data.items()
+        }
+        tax = round(sum(amount for rates in vendor_tax_data.values() for amount in rates.values()), 2)
+        vendor_totals[key] = {
+            'subtotal': round(subtotal, 2),
+            'tax_data': vendor_tax_data,
+            'tax': tax,
+            'total': round(subtotal + tax, 2),
+        }
+    return vendor_totals
+
+
+def backfill_vendor_totals(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    OrderedFood = apps.get_model('orders', 'OrderedFood')
+    lines = {}
+    for item in OrderedFood.objects.order_by('order_id', 'id').iterator():
+        lines.setdefault(item.order_id, []).append(item)
+    orders = list(Order.objects.filter(pk__in=lines).only('pk', 'tax_data'))
+    for order in orders:
+        tax_data = json.loads(order.tax_data or '{}') if isinstance(order.tax_data, str) else order.tax_data or {}
+        order.vendor_totals = compute_vendor_totals(lines[order.pk], tax_data)
+    Order.objects.bulk_update(orders, ['vendor_totals'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_order_item_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='vendor_totals',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.RunPython(backfill_vendor_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,125 @@
+# Generated by Django 4.2.15 on 2026-10-19 19:31
+
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+import json
+
+from django.db import migrations, models
+from django.db.models import F
+from django.db.models.functions import Round
+
+import foodOnline_main.money
+
+
+def to_cents(value):
+    # foodOnline_main.money.to_cents as of this migration
+    if isinstance(value, float):
+        value = repr(value)
+    return int((Decimal(value) * 100).quantize(Decimal(1), ROUND_HALF_UP))
+
+
+def from_cents(cents):
+    # foodOnline_main.money.from_cents as of this migration
+    return Decimal(cents).scaleb(-2)
+
+
+def scale(apps, factor, precision):
+    Order = apps.get_model('orders', 'Order')
+    OrderedFood = apps.get_model('orders', 'OrderedFood')
+    Order.objects.update(
+        total=Round(F('total') * factor, precision), total_tax=Round(F('total_tax') * factor, precision)
+    )
+    OrderedFood.objects.update(
+        price=Round(F('price') * factor, precision), amount=Round(F('amount') * factor, precision)
+    )
+
+
+def amounts_to_cents(apps, schema_editor):
+    # Whole cents in the float columns, the column type change then keeps them as they are
+    scale(apps, 100, 0)
+    Payment = apps.get_model('orders', 'Payment')
+    payments = list(Payment.objects.only('pk', 'amount'))
+    for payment in payments:
+        try:
+            payment.amount = str(to_cents(payment.amount))
+        except (InvalidOperation, ValueError):
+            payment.amount = '0'
+    Payment.objects.bulk_update(payments, ['amount'], batch_size=500)
+
+
+def amounts_to_units(apps, schema_editor):
+    scale(apps, 0.01, 2)
+    Payment = apps.get_model('orders', 'Payment')
+    payments = list(Payment.objects.only('pk', 'amount'))
+    for payment in payments:
+        payment.amount = str(from_cents(int(payment.amount)))
+    Payment.objects.bulk_update(payments, ['amount'], batch_size=500)
+
+
+def exact(value):
+    """Amounts of nested order json as two-place strings, as MoneyJSONEncoder writes them."""
+    if isinstance(value, dict):
+        return {key: exact(item) for key, item in value.items()}
+    if isinstance(value, (int, float, str)) and not isinstance(value, bool):
+        try:
+            return f'{Decimal(repr(value) if isinstance(value, float) else value):.2f}'
+        except InvalidOperation:
+            return value
+    return value
+
+
+def normalize_order_json(apps, schema_editor):
+    # tax_data used to be json encoded twice, as a string, with float amounts
+    Order = apps.get_model('orders', 'Order')
+    orders = list(Order.objects.only('pk', 'tax_data', 'vendor_totals'))
+    for order in orders:
+        tax_data = json.loads(order.tax_data or '{}') if isinstance(order.tax_data, str) else order.tax_data or {}
+        order.tax_data = exact(tax_data)
+        order.vendor_totals = exact(order.vendor_totals or {})
+    Order.objects.bulk_update(orders, ['tax_data', 'vendor_totals'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_orderstatusevent'),
+    ]
+
+    operations = [
+        migrations.RunPython(amounts_to_cents, amounts_to_units),
+        migrations.AlterField(
+            model_name='order',
+            name='total',
+            field=foodOnline_main.money.MoneyField(),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='total_tax',
+            field=foodOnline_main.money.MoneyField(),
+        ),
+        migrations.AlterField(
+            model_name='orderedfood',
+            name='amount',
+            field=foodOnline_main.money.MoneyField(),
+        ),
+        migrations.AlterField(
+            model_name='orderedfood',
+            name='price',
+            field=foodOnline_main.money.MoneyField(),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='amount',
+            field=foodOnline_main.money.MoneyField(),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='tax_data',
+            field=models.JSONField(blank=True, encoder=foodOnline_main.money.MoneyJSONEncoder, help_text="Data format: {'tax_type':{'tax_percentage':'tax_amount'}}"),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='vendor_totals',
+            field=models.JSONField(blank=True, default=dict, encoder=foodOnline_main.money.MoneyJSONEncoder),
+        ),
+        migrations.RunPython(normalize_order_json, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.15 on 2026-10-19 19:33
+
+import json
+
+from django.db import migrations, models
+import django.db.models.deletion
+import foodOnline_main.money
+
+
+def backfill_order_taxes(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    OrderTax = apps.get_model('orders', 'OrderTax')
+    taxes = []
+    for order in Order.objects.only('pk', 'tax_data', 'created_at').iterator(chunk_size=500):
+        # Still decode tax_data json encoded a second time, as Order.get_tax_data does
+        tax_data = json.loads(order.tax_data or '{}') if isinstance(order.tax_data, str) else order.tax_data or {}
+        taxes.extend(
+            OrderTax(order_id=order.pk, tax_type=tax_type, percentage=percentage, amount=amount, created_at=order.created_at)
+            for tax_type, amounts in tax_data.items()
+            for percentage, amount in amounts.items()
+        )
+        if len(taxes) >= 500:
+            OrderTax.objects.bulk_create(taxes)
+            taxes = []
+    OrderTax.objects.bulk_create(taxes)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_money_in_cents'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderTax',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tax_type', models.CharField(max_length=20)),
+                ('percentage', models.DecimalField(decimal_places=2, max_digits=4)),
+                ('amount', foodOnline_main.money.MoneyField()),
+                ('created_at', models.DateTimeField()),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='taxes', to='orders.order')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created_at', 'tax_type'], name='order_tax_created_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_order_taxes, migrations.RunPython.noop),
+    ]
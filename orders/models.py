@@ -1,5 +1,10 @@
+import json
+
 from django.db import models
+from django.db.models import Count, Prefetch, Q, Sum
+from django.db.models.functions import TruncMonth
 from accounts.models import User
+from foodOnline_main.money import MoneyField, MoneyJSONEncoder
 from menu.models import FoodItem
 from vendor.models import Vendor
 
@@ -12,20 +17,54 @@ class Payment(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     transaction_id = models.CharField(max_length=100)
     payment_method = models.CharField(choices=PAYMENT_METHOD, max_length=100)
-    amount = models.CharField(max_length=10)
+    amount = MoneyField()
     status = models.CharField(max_length=100)
     created_at = models.DateTimeField(auto_now_add=True)
     def __str__(self):
         return self.transaction_id
     
 
+class OrderQuerySet(models.QuerySet):
+    def for_vendor_user(self, user):
+        """Orders of the vendor owned by ``user``, including ones it only has some lines in."""
+        return self.filter(
+            Q(vendor__user=user)
+            | Q(pk__in=OrderedFood.objects.filter(vendor__user=user).values('order_id'))
+        )
+
+    def owned_by_vendor_user(self, user):
+        """Orders whose vendor is owned by ``user``, the only ones it may change the status of."""
+        return self.filter(vendor__user=user)
+
+    def with_vendor_lines(self, user):
+        """Prefetch the lines of ``user``'s vendor with their food items into ``vendor_lines``, in one query."""
+        return self.prefetch_related(
+            Prefetch(
+                'orderedfood_set',
+                queryset=OrderedFood.objects.filter(vendor__user=user).select_related('fooditem').order_by('id'),
+                to_attr='vendor_lines',
+            )
+        )
+
+
 class Order(models.Model):
+    NEW = 'New'
+    ACCEPTED = 'Accepted'
+    COMPLETED = 'Completed'
+    CANCELLED = 'Cancelled'
     STATUS = (
-        ('New', 'New'),
-        ('Accepted', 'Accepted'),
-        ('Completed', 'Completed'),
-        ('Cancelled', 'Cancelled'),
+        (NEW, 'New'),
+        (ACCEPTED, 'Accepted'),
+        (COMPLETED, 'Completed'),
+        (CANCELLED, 'Cancelled'),
     )
+    # Statuses an order may move to from each status, see orders.lifecycle
+    TRANSITIONS = {
+        NEW: (ACCEPTED, CANCELLED),
+        ACCEPTED: (COMPLETED, CANCELLED),
+        COMPLETED: (),
+        CANCELLED: (),
+    }
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     payment = models.ForeignKey(Payment, on_delete=models.SET_NULL, blank=True, null=True)
     order_number = models.CharField(max_length=20)
@@ -38,23 +77,48 @@ class Order(models.Model):
     state = models.CharField(max_length=15, blank=True)
     city = models.CharField(max_length=50)
     pin_code = models.CharField(max_length=10)
-    total = models.FloatField()
-    tax_data = models.JSONField(blank=True, help_text = "Data format: {'tax_type':{'tax_percentage':'tax_amount'}}")
-    total_tax = models.FloatField()
+    total = MoneyField()
+    tax_data = models.JSONField(blank=True, encoder=MoneyJSONEncoder, help_text = "Data format: {'tax_type':{'tax_percentage':'tax_amount'}}")
+    total_tax = MoneyField()
     payment_method = models.CharField(max_length=25)
     status = models.CharField(max_length=15, choices=STATUS, default='New')
     is_ordered = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Copied from the OrderedFood lines when the order is paid, so order lists don't need to join them
+    item_count = models.PositiveIntegerField(default=0)
+    item_summary = models.CharField(max_length=255, blank=True)
+    # Subtotal, taxes and total of each vendor's lines, keyed by vendor id, also filled when the order is paid
+    vendor_totals = models.JSONField(default=dict, blank=True, encoder=MoneyJSONEncoder)
 
     # New field to link to Vendor
     vendor = models.ForeignKey(Vendor, on_delete=models.SET_NULL, null=True)
 
+    objects = OrderQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Order history, newest first, paginated on (created_at, id)
+            models.Index(fields=['user', 'is_ordered', '-created_at', '-id'], name='order_user_history_idx'),
+        ]
+
     # Concatenate first name and last name
     @property
     def name(self):
         return f'{self.first_name} {self.last_name}'
+
+    def get_tax_data(self):
+        # Older orders hold the tax data json encoded a second time, as a string
+        if isinstance(self.tax_data, str):
+            return json.loads(self.tax_data or '{}')
+        return self.tax_data or {}
+
+    def allowed_transitions(self):
+        return self.TRANSITIONS[self.status]
+
+    def totals_for_vendor(self, vendor_id):
+        return self.vendor_totals.get(str(vendor_id), {'subtotal': 0, 'tax_data': {}, 'tax': 0, 'total': 0})
     
     def __str__(self):
         return self.order_number
@@ -66,8 +130,8 @@ class OrderedFood(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     fooditem = models.ForeignKey(FoodItem, on_delete=models.CASCADE)
     quantity = models.IntegerField()
-    price = models.FloatField()
-    amount = models.FloatField()
+    price = MoneyField()
+    amount = MoneyField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -76,3 +140,93 @@ class OrderedFood(models.Model):
 
     def __str__(self):
         return self.fooditem.food_title
+
+
+class OrderTaxQuerySet(models.QuerySet):
+    def paid(self):
+        return self.filter(order__is_ordered=True)
+
+    def monthly_report(self, start=None, end=None):
+        """
+        Tax collected per month, tax type and percentage between ``start`` and
+        ``end``, as one GROUP BY over the created_at index.
+        """
+        taxes = self.paid()
+        if start is not None:
+            taxes = taxes.filter(created_at__gte=start)
+        if end is not None:
+            taxes = taxes.filter(created_at__lt=end)
+        return (
+            taxes.annotate(month=TruncMonth('created_at'))
+            .values('month', 'tax_type', 'percentage')
+            .annotate(amount=Sum('amount'), orders=Count('order_id'))
+            .order_by('month', 'tax_type', 'percentage')
+        )
+
+
+class OrderTax(models.Model):
+    """One tax line of an order, the rows of its tax_data, so reports can add them up in SQL."""
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='taxes')
+    tax_type = models.CharField(max_length=20)
+    percentage = models.DecimalField(max_digits=4, decimal_places=2)
+    amount = MoneyField()
+    # The order's created_at, reports filter and group on it without joining Order
+    created_at = models.DateTimeField()
+
+    objects = OrderTaxQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'tax_type'], name='order_tax_created_idx'),
+        ]
+
+    @classmethod
+    def lines_for(cls, order, tax_data=None):
+        """Unsaved OrderTax rows of ``tax_data``, the order's own by default."""
+        tax_data = order.get_tax_data() if tax_data is None else tax_data
+        return [
+            cls(order=order, tax_type=tax_type, percentage=percentage, amount=amount, created_at=order.created_at)
+            for tax_type, amounts in tax_data.items()
+            for percentage, amount in amounts.items()
+        ]
+
+    def __str__(self):
+        return f'{self.tax_type} {self.percentage}%'
+
+
+class OrderStatusEvent(models.Model):
+    """Append-only log of order status changes, written by orders.lifecycle."""
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='status_events')
+    # A vendor with lines in the order, there is one event per such vendor so each one's
+    # changes can be listed without joining Order or its lines
+    vendor = models.ForeignKey(Vendor, on_delete=models.SET_NULL, null=True)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    from_status = models.CharField(max_length=15, choices=Order.STATUS)
+    to_status = models.CharField(max_length=15, choices=Order.STATUS)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # "What changed since" for one vendor, and for everyone
+            models.Index(fields=['vendor', 'created_at'], name='order_event_vendor_idx'),
+            models.Index(fields=['created_at'], name='order_event_created_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.order_id}: {self.from_status} -> {self.to_status}'
+
+
+class StockReservation(models.Model):
+    """Stock of a limited item held for an order between checkout and payment, see orders.reservations."""
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='reservations')
+    fooditem = models.ForeignKey(FoodItem, on_delete=models.CASCADE)
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['expires_at'], name='reservation_expires_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.order_id}: {self.quantity} x {self.fooditem_id}'
@@ -0,0 +1,49 @@
+import base64
+from dataclasses import dataclass
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+@dataclass
+class KeysetPage:
+    object_list: list
+    next_cursor: str = None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def encode_cursor(value, pk):
+    return base64.urlsafe_b64encode(f'{value.isoformat()}|{pk}'.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Return ``(datetime, pk)``, or ``None`` for a missing or malformed cursor."""
+    try:
+        value, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return parse_datetime(value), int(pk)
+    except (AttributeError, ValueError, UnicodeDecodeError):
+        return None
+
+
+def keyset_paginate(queryset, cursor, per_page, field='created_at'):
+    """
+    Newest first page of ``queryset`` after ``cursor``.
+
+    Unlike OFFSET pagination every page costs the same index range scan, however
+    far back the customer goes. Ties on ``field`` are broken by the primary key.
+    """
+    queryset = queryset.order_by(f'-{field}', '-pk')
+    position = decode_cursor(cursor) if cursor else None
+    if position and position[0]:
+        value, pk = position
+        queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'pk__lt': pk}))
+
+    object_list = list(queryset[:per_page + 1])
+    if len(object_list) <= per_page:
+        return KeysetPage(object_list)
+    object_list = object_list[:per_page]
+    last = object_list[-1]
+    return KeysetPage(object_list, encode_cursor(getattr(last, field), last.pk))
@@ -0,0 +1,86 @@
+"""
+Stock held for orders between checkout and payment.
+
+Placing an order takes the stock of its limited items (menu.stock) and
+records it as reservations expiring after STOCK_RESERVATION_SECONDS. Paying
+makes them final. Expired reservations of abandoned checkouts count as left
+on the menus (menu.stock.stock_levels) and go back to the stock when someone
+orders the same items, or with the release_reservations command, scheduled
+every few minutes.
+"""
+import datetime
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from menu.stock import put_back, take
+
+from .models import StockReservation
+
+
+def cart_quantities(cart_items):
+    """``{fooditem_id: quantity}`` of a user's cart."""
+    quantities = Counter()
+    for item in cart_items:
+        quantities[item.fooditem_id] += item.quantity
+    return quantities
+
+
+def release(reservations):
+    """Put the stock of the ``reservations`` queryset back and delete them, returns how many there were."""
+    with transaction.atomic():
+        # Rows another release or a payment holds are theirs to settle
+        held = list(reservations.select_for_update(skip_locked=True).values_list("pk", "fooditem_id", "quantity"))
+        quantities = Counter()
+        for _, fooditem_id, quantity in held:
+            quantities[fooditem_id] += quantity
+        put_back(quantities)
+        StockReservation.objects.filter(pk__in=[pk for pk, _, _ in held]).delete()
+    return len(held)
+
+
+def release_expired(fooditem_ids=None, now=None):
+    """Release the reservations expired at ``now``, only those of ``fooditem_ids`` when given."""
+    expired = StockReservation.objects.filter(expires_at__lte=now or timezone.now())
+    if fooditem_ids is not None:
+        expired = expired.filter(fooditem_id__in=fooditem_ids)
+    return release(expired)
+
+
+def reserve(order, cart_items):
+    """
+    Hold the stock of the limited items of ``cart_items`` for ``order``,
+    raising menu.stock.OutOfStock when some are sold out.
+    """
+    quantities = cart_quantities(cart_items)
+    with transaction.atomic():
+        # A checkout started again, or stock abandoned by others, is free for this one
+        release(StockReservation.objects.filter(order__user=order.user_id, order__is_ordered=False))
+        release_expired(quantities)
+        taken = take(quantities)
+        expires_at = timezone.now() + datetime.timedelta(seconds=settings.STOCK_RESERVATION_SECONDS)
+        StockReservation.objects.bulk_create([
+            StockReservation(order=order, fooditem_id=fooditem_id, quantity=quantity, expires_at=expires_at)
+            for fooditem_id, quantity in taken.items()
+        ])
+
+
+def confirm(order, cart_items):
+    """
+    Make the stock of ``order`` final at payment. Reservations not released
+    yet still hold their stock, even past their expiry. What was released is
+    taken again, raising menu.stock.OutOfStock when it went to someone else.
+    ``cart_items`` may differ from the cart the order was placed with.
+    """
+    quantities = cart_quantities(cart_items)
+    with transaction.atomic():
+        # Locked so that a concurrent release skips them
+        held = list(order.reservations.select_for_update().values_list("pk", "fooditem_id", "quantity"))
+        for _, fooditem_id, quantity in held:
+            quantities[fooditem_id] -= quantity
+        take(+quantities)
+        # Held for items since removed from the cart
+        put_back(-quantities)
+        StockReservation.objects.filter(pk__in=[pk for pk, _, _ in held]).delete()
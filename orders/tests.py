@@ -1,3 +1,321 @@
+import datetime
+import json
+from decimal import Decimal
+
+from django.core.cache import caches
+from django.db.models import Sum
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from foodOnline_main.money import MoneyJSONEncoder, compute_totals, from_cents, to_cents
+from marketplace.models import Cart
+from menu.models import Category, FoodItem, StockShard
+from menu.stock import set_stock, stock_levels
+from vendor.models import Vendor
+
+from .lifecycle import InvalidTransition, transition_orders
+from .models import Order, OrderedFood, OrderStatusEvent, Payment, StockReservation
+from .pagination import decode_cursor, encode_cursor, keyset_paginate
+from .reservations import release_expired
+
+AJAX = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+
+ORDER_FORM = {
+    'first_name': 'Asha', 'last_name': 'Rao', 'phone': '5550100', 'email': 'asha@example.com',
+    'address': '1 Main St', 'country': 'India', 'state': 'KA', 'city': 'Bengaluru', 'pin_code': '560001',
+    'payment_method': 'PayPal',
+}
+
+
+def create_user(username, role=User.CUSTOMER):
+    user = User.objects.create_user(
+        first_name=username.title(), last_name='Test', username=username,
+        email=f'{username}@example.com', password='secret',
+    )
+    user.role, user.is_active = role, True
+    user.save()
+    return user
+
+
+def create_vendor(username):
+    user = create_user(username, role=User.VENDOR)
+    return Vendor.objects.create(
+        user=user, user_profile=user.userprofile, vendor_name=username.title(),
+        vendor_slug=username, vendor_license='vendor/license/license.jpg', is_approved=True,
+    )
+
+
+def create_fooditem(vendor, title, price='5.00'):
+    category, _ = Category.objects.get_or_create(vendor=vendor, category_name='Mains')
+    return FoodItem.objects.create(
+        vendor=vendor, category=category, food_title=title, price=price, image='foodimages/food.jpg',
+    )
+
+
+def create_order(customer, vendor, status=Order.NEW, **kwargs):
+    order = Order.objects.create(
+        user=customer, vendor=vendor, status=status, is_ordered=True, total='10.00', total_tax='0.00',
+        tax_data={}, payment_method='PayPal', first_name='Asha', last_name='Rao',
+        email='asha@example.com', address='1 Main St', city='Bengaluru', pin_code='560001', **kwargs
+    )
+    order.order_number = f'ORD{order.pk}'
+    order.save()
+    return order
+
+
+class CheckoutTestCase(TestCase):
+    """A customer with a vendor's dishes to order."""
+
+    def setUp(self):
+        for alias in caches:
+            caches[alias].clear()
+        self.vendor = create_vendor('dosacorner')
+        self.dosa = create_fooditem(self.vendor, 'Dosa', '4.50')
+        self.idli = create_fooditem(self.vendor, 'Idli', '3.50')
+        self.customer = create_user('asha')
+        self.client.force_login(self.customer)
+
+    def place_order(self, *cart):
+        for fooditem, quantity in cart:
+            Cart.objects.create(user=self.customer, fooditem=fooditem, quantity=quantity)
+        self.client.post(reverse('place_order'), ORDER_FORM)
+        return Order.objects.filter(user=self.customer).latest('id')
+
+    def pay(self, order, transaction_id='TX1'):
+        return self.client.post(reverse('payments'), {
+            'order_number': order.order_number, 'transaction_id': transaction_id,
+            'payment_method': 'PayPal', 'status': 'COMPLETED',
+        }, **AJAX)
+
+
+class PaymentTests(CheckoutTestCase):
+    def test_payment_moves_the_cart_into_the_order(self):
+        order = self.place_order((self.dosa, 2), (self.idli, 1))
+
+        response = self.pay(order)
+
+        self.assertEqual(response.status_code, 200)
+        order.refresh_from_db()
+        self.assertTrue(order.is_ordered)
+        self.assertEqual(order.item_count, 3)
+        self.assertEqual(OrderedFood.objects.filter(order=order).count(), 2)
+        self.assertFalse(Cart.objects.filter(user=self.customer).exists())
+
+    def test_an_order_is_paid_only_once(self):
+        order = self.place_order((self.dosa, 2), (self.idli, 1))
+        self.pay(order)
+        order.refresh_from_db()
+        paid = (order.payment_id, order.item_count, order.item_summary, order.vendor_totals)
+        # Something else in the cart when the payment is sent again
+        Cart.objects.create(user=self.customer, fooditem=self.idli, quantity=1)
+
+        response = self.pay(order, transaction_id='TX2')
+
+        self.assertEqual(response.status_code, 409)
+        order.refresh_from_db()
+        self.assertEqual((order.payment_id, order.item_count, order.item_summary, order.vendor_totals), paid)
+        self.assertEqual(OrderedFood.objects.filter(order=order).count(), 2)
+        self.assertEqual(Payment.objects.count(), 1)
+        self.assertTrue(Cart.objects.filter(user=self.customer).exists())
+
+    def test_someone_elses_order_is_not_found(self):
+        order = self.place_order((self.dosa, 1))
+        self.client.force_login(create_user('ravi'))
+
+        self.assertEqual(self.pay(order).status_code, 404)
+
+
+class ReservationTests(CheckoutTestCase):
+    def setUp(self):
+        super().setUp()
+        set_stock(self.dosa, 5, shards=2)
+
+    def left(self):
+        return sum(StockShard.objects.filter(fooditem=self.dosa).values_list('quantity', flat=True))
+
+    def expire(self, order):
+        order.reservations.update(expires_at=timezone.now() - datetime.timedelta(seconds=1))
+
+    def test_placing_an_order_holds_the_limited_items(self):
+        order = self.place_order((self.dosa, 2), (self.idli, 1))
+
+        self.assertEqual(list(order.reservations.values_list('fooditem', 'quantity')), [(self.dosa.pk, 2)])
+        self.assertEqual(self.left(), 3)
+
+    def test_sold_out_items_are_refused_at_checkout(self):
+        Cart.objects.create(user=self.customer, fooditem=self.dosa, quantity=6)
+
+        response = self.client.post(reverse('place_order'), ORDER_FORM)
+
+        self.assertRedirects(response, reverse('cart'), fetch_redirect_response=False)
+        self.assertFalse(StockReservation.objects.exists())
+        self.assertEqual(self.left(), 5)
+
+    def test_payment_makes_the_reservation_final(self):
+        order = self.place_order((self.dosa, 2))
+
+        self.assertEqual(self.pay(order).status_code, 200)
+
+        self.assertFalse(StockReservation.objects.exists())
+        self.assertEqual(self.left(), 3)
+
+    def test_a_new_checkout_frees_the_previous_one(self):
+        self.place_order((self.dosa, 2))
+        Cart.objects.filter(user=self.customer).delete()
+
+        order = self.place_order((self.dosa, 1))
+
+        self.assertEqual(list(StockReservation.objects.values_list('order', 'quantity')), [(order.pk, 1)])
+        self.assertEqual(self.left(), 4)
+
+    def test_expired_reservations_go_back_to_the_stock(self):
+        order = self.place_order((self.dosa, 5))
+        self.assertEqual(stock_levels(self.vendor), {self.dosa.pk: 0})
+        self.expire(order)
+        caches['menus'].clear()
+
+        # Shown as left before they are released
+        self.assertEqual(stock_levels(self.vendor), {self.dosa.pk: 5})
+        self.assertEqual(release_expired(), 1)
+        self.assertEqual(self.left(), 5)
+
+    def test_paying_after_the_stock_went_to_someone_else(self):
+        order = self.place_order((self.dosa, 4))
+        self.expire(order)
+        # Another customer orders the released stock
+        other = create_user('ravi')
+        self.client.force_login(other)
+        Cart.objects.create(user=other, fooditem=self.dosa, quantity=3)
+        self.client.post(reverse('place_order'), ORDER_FORM)
+        self.client.force_login(self.customer)
+
+        response = self.pay(order)
+
+        self.assertEqual(response.status_code, 409)
+        order.refresh_from_db()
+        self.assertFalse(order.is_ordered)
+        self.assertEqual(self.left(), 2)
+
+
+class TransitionTests(TestCase):
+    def setUp(self):
+        self.vendor = create_vendor('dosacorner')
+        self.customer = create_user('asha')
+
+    def test_moves_the_orders_that_may_go_there_and_logs_them(self):
+        new = create_order(self.customer, self.vendor)
+        accepted = create_order(self.customer, self.vendor, Order.ACCEPTED)
+        completed = create_order(self.customer, self.vendor, Order.COMPLETED)
+
+        moved, skipped = transition_orders(Order.objects.all(), Order.CANCELLED, self.vendor.user)
+
+        self.assertCountEqual(moved, [new.pk, accepted.pk])
+        self.assertEqual(skipped, [completed.pk])
+        self.assertEqual(set(Order.objects.values_list('status', flat=True)), {Order.CANCELLED, Order.COMPLETED})
+        self.assertCountEqual(
+            OrderStatusEvent.objects.values_list('order_id', 'from_status', 'to_status', 'user'),
+            [
+                (new.pk, Order.NEW, Order.CANCELLED, self.vendor.user.pk),
+                (accepted.pk, Order.ACCEPTED, Order.CANCELLED, self.vendor.user.pk),
+            ],
+        )
+
+    def test_a_finished_order_stays_finished(self):
+        order = create_order(self.customer, self.vendor, Order.COMPLETED)
+
+        moved, skipped = transition_orders(Order.objects.all(), Order.ACCEPTED)
+
+        self.assertEqual((moved, skipped), ([], [order.pk]))
+        self.assertFalse(OrderStatusEvent.objects.exists())
+
+    def test_unknown_status(self):
+        create_order(self.customer, self.vendor)
+        with self.assertRaises(InvalidTransition):
+            transition_orders(Order.objects.all(), 'Shipped')
+
+    def test_only_the_owning_vendor_moves_an_order(self):
+        order = create_order(self.customer, self.vendor, vendor_totals={str(self.vendor.pk): {}})
+        other = create_vendor('idlihouse')
+        # Lines of the other vendor in the same order
+        order.vendor_totals[str(other.pk)] = {}
+        order.save()
+
+        self.assertEqual(transition_orders(Order.objects.all(), Order.ACCEPTED, other.user), ([], []))
+        self.assertEqual(transition_orders(Order.objects.all(), Order.ACCEPTED, self.vendor.user), ([order.pk], []))
+        # Both vendors see the change
+        self.assertCountEqual(
+            OrderStatusEvent.objects.values_list('vendor_id', flat=True), [self.vendor.pk, other.pk]
+        )
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        vendor = create_vendor('dosacorner')
+        customer = create_user('asha')
+        self.orders = [create_order(customer, vendor) for _ in range(5)]
+        # Ties on created_at are broken by the id
+        instant = timezone.now()
+        Order.objects.filter(pk__in=[order.pk for order in self.orders[1:4]]).update(created_at=instant)
+        Order.objects.filter(pk=self.orders[0].pk).update(created_at=instant - datetime.timedelta(minutes=1))
+        Order.objects.filter(pk=self.orders[4].pk).update(created_at=instant + datetime.timedelta(minutes=1))
+
+    def test_pages_cover_every_order_once_newest_first(self):
+        seen, cursor = [], None
+        while True:
+            page = keyset_paginate(Order.objects.all(), cursor, 2)
+            seen.extend(order.pk for order in page.object_list)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+
+        self.assertEqual(seen, [order.pk for order in reversed(self.orders)])
+
+    def test_malformed_cursor_starts_over(self):
+        self.assertIsNone(decode_cursor('not a cursor'))
+        page = keyset_paginate(Order.objects.all(), 'not a cursor', 10)
+        self.assertEqual(len(page.object_list), 5)
+
+    def test_cursor_round_trip(self):
+        instant = timezone.now()
+        self.assertEqual(decode_cursor(encode_cursor(instant, 42)), (instant, 42))
+
+
+class MoneyTests(TestCase):
+    def setUp(self):
+        self.vendor = create_vendor('dosacorner')
+        self.customer = create_user('asha')
+
+    def test_cents(self):
+        self.assertEqual(to_cents('12.345'), 1235)
+        self.assertEqual(to_cents(Decimal('0.005')), 1)
+        self.assertEqual(to_cents(0.1 + 0.2), 30)
+        self.assertEqual(to_cents(7), 700)
+        self.assertEqual(from_cents(1250), Decimal('12.50'))
+        self.assertEqual(str(from_cents(5)), '0.05')
+
+    def test_money_field_round_trip(self):
+        for value, expected in [('24.71', '24.71'), (Decimal('3.5'), '3.50'), (0.1, '0.10'), (12, '12.00')]:
+            with self.subTest(value=value):
+                order = create_order(self.customer, self.vendor)
+                Order.objects.filter(pk=order.pk).update(total=value)
+                order.refresh_from_db()
+                self.assertEqual(str(order.total), expected)
+
+    def test_sums_and_comparisons_in_sql_are_exact(self):
+        for total in ['0.10', '0.20', '12.49', '12.50']:
+            order = create_order(self.customer, self.vendor)
+            Order.objects.filter(pk=order.pk).update(total=total)
+
+        self.assertEqual(Order.objects.aggregate(sum=Sum('total'))['sum'], Decimal('25.29'))
+        self.assertEqual(Order.objects.filter(total__gte=Decimal('12.5')).count(), 1)
+        self.assertEqual(Order.objects.filter(total__lt=0.3).count(), 2)
+
+    def test_totals_are_rounded_once_on_the_subtotal(self):
+        subtotal, taxes, tax, total = compute_totals([('0.10', 3), ('1.15', 1)], [('GST', Decimal('5.00'))])
+
+        self.assertEqual((subtotal, taxes, tax, total), (145, {'GST': {'5.00': 7}}, 7, 152))
 
-# Create your tests here.
+    def test_json_amounts_are_exact_strings(self):
+        self.assertEqual(json.dumps({'total': Decimal('12.5')}, cls=MoneyJSONEncoder), '{"total": "12.50"}')
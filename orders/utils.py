@@ -1,7 +1,43 @@
 import datetime
 
+from foodOnline_main.money import compute_totals, from_cents
+
 
 def generate_order_number(pk):
     current_datetime = datetime.datetime.now().strftime('%Y%m%d%H%M%S') #20220616233810 + pk
     order_number = current_datetime + str(pk)
-    return order_number
\ No newline at end of file
+    return order_number
+
+
+def summarize_items(ordered_items, max_length=255):
+    """Item count and a "2 x Pizza, 1 x Coke" summary of the given OrderedFood lines."""
+    item_count = sum(item.quantity for item in ordered_items)
+    summary = ', '.join(f'{item.quantity} x {item.fooditem.food_title}' for item in ordered_items)
+    if len(summary) > max_length:
+        summary = summary[:max_length - 3].rsplit(',', 1)[0] + '...'
+    return item_count, summary
+
+
+def compute_vendor_totals(ordered_items, tax_data):
+    """
+    Split an order's totals per vendor, applying the order's tax percentages
+    to each vendor's subtotal. Returns ``{vendor_id: {subtotal, tax_data, tax, total}}``.
+    """
+    lines = {}
+    for item in ordered_items:
+        lines.setdefault(str(item.vendor_id), []).append((item.amount, 1))
+    rates = [(tax_type, percentage) for tax_type, amounts in tax_data.items() for percentage in amounts]
+
+    vendor_totals = {}
+    for key, vendor_lines in lines.items():
+        subtotal, taxes, tax, total = compute_totals(vendor_lines, rates)
+        vendor_totals[key] = {
+            'subtotal': from_cents(subtotal),
+            'tax_data': {
+                tax_type: {percentage: from_cents(amount) for percentage, amount in amounts.items()}
+                for tax_type, amounts in taxes.items()
+            },
+            'tax': from_cents(tax),
+            'total': from_cents(total),
+        }
+    return vendor_totals
@@ -1,17 +1,21 @@
-from .utils import generate_order_number
+from .utils import compute_vendor_totals, generate_order_number, summarize_items
+from django.contrib import messages
 from django.shortcuts import redirect
 from django.views.generic.edit import FormView
 from django.views.generic import TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin
-from .models import  Order
+from .events import ORDER_CREATED, publish_order_event
+from .models import  Order, OrderTax
 from marketplace.models import Cart
 from .forms import OrderForm
 from marketplace.context_processors import get_cart_amounts
 from accounts.utils import send_notification
-from django.http import JsonResponse
+from foodOnline_main.fastjson import FastJsonResponse
+from django.db import transaction
 from .models import Payment, OrderedFood
-from decimal import Decimal
-import json
+from .reservations import confirm, reserve
+from menu.models import FoodItem
+from menu.stock import OutOfStock
 
 
 class PlaceOrderView(LoginRequiredMixin, FormView):
@@ -19,12 +23,6 @@ class PlaceOrderView(LoginRequiredMixin, FormView):
     template_name = 'orders/place_order.html'
     form_class = OrderForm
 
-    # Helper function to convert Decimal to float
-    def decimal_to_float(self, obj):
-        if isinstance(obj, Decimal):
-            return float(obj)
-        raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
-
     def get_cart_data(self, cart_items):
         amounts = get_cart_amounts(self.request)
         return {
@@ -47,18 +45,31 @@ class PlaceOrderView(LoginRequiredMixin, FormView):
         return context
 
     def form_valid(self, form):
-        order = self.create_order(form)
+        # Items switched off or sold out since they were added to the cart
+        unavailable = list(
+            Cart.objects.filter(user=self.request.user)
+            .exclude(fooditem__in=FoodItem.objects.available())
+            .values_list('fooditem__food_title', flat=True)
+        )
+        if unavailable:
+            messages.error(self.request, f"Not available right now: {', '.join(unavailable)}.")
+            return redirect('cart')
+        try:
+            order = self.create_order(form)
+        except OutOfStock as e:
+            messages.error(self.request, str(e))
+            return redirect('cart')
         return self.render_to_response(self.get_context_data(order=order))
 
+    @transaction.atomic
     def create_order(self, form):
         amounts = get_cart_amounts(self.request)
-        # Convert Decimal to float for tax_dict
-        tax_data = json.dumps(amounts['tax_dict'], default=self.decimal_to_float)
 
+        # tax_data's encoder stores the Decimal amounts as exact strings
         order = Order.objects.create(
             user=self.request.user,
             total=amounts['grand_total'],
-            tax_data=tax_data,
+            tax_data=amounts['tax_dict'],
             total_tax=amounts['tax'],
             payment_method=self.request.POST['payment_method'],
             vendor=self.get_vendor(),
@@ -66,6 +77,9 @@ class PlaceOrderView(LoginRequiredMixin, FormView):
         )
         order.order_number = generate_order_number(order.id)
         order.save()  # Update order number
+        OrderTax.objects.bulk_create(OrderTax.lines_for(order, amounts['tax_dict']))
+        # Limited items are held for the customer while they pay
+        reserve(order, Cart.objects.filter(user=self.request.user))
 
         return order
     
@@ -91,20 +105,30 @@ class PaymentsView(LoginRequiredMixin, TemplateView):
             payment_method = request.POST.get('payment_method')
             status = request.POST.get('status')  # Static Status
 
-            # Fetch the Order object
             try:
-                order = Order.objects.get(user=request.user, order_number=order_number)
-            except Order.DoesNotExist:
-                return JsonResponse({'error': 'Order does not exist.'}, status=404)
+                with transaction.atomic():
+                    # Locked, a second payment of the same order waits for this one and then finds it paid
+                    order = Order.objects.select_for_update().filter(
+                        user=request.user, order_number=order_number
+                    ).first()
+                    if order is None:
+                        return FastJsonResponse({'error': 'Order does not exist.'}, status=404)
+                    if order.is_ordered:
+                        return FastJsonResponse({'error': 'This order is already paid.'}, status=409)
+
+                    # Limited items are sold for good, or the payment is refused when they ran out
+                    confirm(order, Cart.objects.filter(user=request.user))
 
-            # Create Payment object and save it
-            payment = self.create_payment(request.user, transaction_id, payment_method, order.total, status)
-            
-            # Update the Order with the payment details
-            self.update_order(order, payment)
+                    # Create Payment object and save it
+                    payment = self.create_payment(request.user, transaction_id, payment_method, order.total, status)
 
-            # Move Cart items to OrderedFood model
-            self.move_cart_to_ordered_food(request.user, order, payment)
+                    # Update the Order with the payment details
+                    self.update_order(order, payment)
+
+                    # Move Cart items to OrderedFood model
+                    self.move_cart_to_ordered_food(request.user, order, payment)
+            except OutOfStock as e:
+                return FastJsonResponse({'error': str(e)}, status=409)
 
 
             # Prepare response
@@ -112,9 +136,9 @@ class PaymentsView(LoginRequiredMixin, TemplateView):
                 'order_number': order_number,
                 'transaction_id': transaction_id,
             }
-            return JsonResponse(response)
+            return FastJsonResponse(response)
 
-        return JsonResponse({'error': 'Invalid request. This endpoint only accepts AJAX requests.'}, status=400)
+        return FastJsonResponse({'error': 'Invalid request. This endpoint only accepts AJAX requests.'}, status=400)
 
     def create_payment(self, user, transaction_id, payment_method, amount, status):
         """Creates and saves a payment."""
@@ -136,9 +160,9 @@ class PaymentsView(LoginRequiredMixin, TemplateView):
 
     def move_cart_to_ordered_food(self, user, order, payment):
         """Moves cart items to OrderedFood model."""
-        cart_items = Cart.objects.filter(user=user)
-        for item in cart_items:
-            OrderedFood.objects.create(
+        cart_items = Cart.objects.filter(user=user).select_related('fooditem')
+        ordered_items = [
+            OrderedFood(
                 order=order,
                 payment=payment,
                 user=user,
@@ -146,8 +170,18 @@ class PaymentsView(LoginRequiredMixin, TemplateView):
                 quantity=item.quantity,
                 price=item.fooditem.price,
                 amount=item.fooditem.price * item.quantity,
-                vendor=item.fooditem.vendor
+                vendor_id=item.fooditem.vendor_id
             )
+            for item in cart_items
+        ]
+        OrderedFood.objects.bulk_create(ordered_items)
+
+        order.item_count, order.item_summary = summarize_items(ordered_items)
+        order.vendor_totals = compute_vendor_totals(ordered_items, order.get_tax_data())
+        Order.objects.filter(pk=order.pk).update(
+            item_count=order.item_count, item_summary=order.item_summary, vendor_totals=order.vendor_totals
+        )
 
         cart_items.delete()
+        publish_order_event(order, ORDER_CREATED)
 
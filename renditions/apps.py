@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class RenditionsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "renditions"
+
+    def ready(self):
+        import renditions.signals
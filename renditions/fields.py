@@ -0,0 +1,22 @@
+from django.conf import settings
+from rest_framework import serializers
+
+from .utils import RENDITION_FORMATS, rendition_url
+
+
+class RenditionsField(serializers.Field):
+    """Read-only field with the URL of every rendition of an image field."""
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, image):
+        if not image:
+            return None
+        request = self.context.get("request")
+        build = request.build_absolute_uri if request else (lambda url: url)
+        return {
+            size: {fmt: build(rendition_url(image, size, fmt)) for fmt in RENDITION_FORMATS}
+            for size in settings.RENDITION_SIZES
+        }
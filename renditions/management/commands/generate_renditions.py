@@ -0,0 +1,40 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from renditions.pipeline import executor, generate_renditions
+from renditions.utils import IMAGE_FIELDS
+
+
+class Command(BaseCommand):
+    help = "Generate missing image renditions for media uploaded before the pipeline existed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--overwrite", action="store_true", help="Regenerate existing renditions")
+
+    def handle(self, *args, **options):
+        names = set()
+        for model_label, field_name in IMAGE_FIELDS:
+            model = apps.get_model(model_label)
+            names.update(
+                model.objects.exclude(**{field_name: ""})
+                .exclude(**{f"{field_name}__isnull": True})
+                .values_list(field_name, flat=True)
+            )
+
+        futures = {
+            name: executor.submit(generate_renditions, name, options["overwrite"])
+            for name in sorted(names)
+        }
+        written = failed = 0
+        for name, future in futures.items():
+            try:
+                written += future.result()
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"{name}: {e}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(names)} images processed, {written} renditions written, {failed} failed."
+            )
+        )
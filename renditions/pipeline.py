@@ -0,0 +1,57 @@
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from .utils import RENDITION_FORMATS, rendition_name
+
+logger = logging.getLogger(__name__)
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.RENDITION_WORKERS, thread_name_prefix="renditions"
+)
+
+
+def render(image, size):
+    width, height = settings.RENDITION_SIZES[size]
+    # Crop to the exact box so templates can rely on the dimensions
+    return ImageOps.fit(image, (width, height), Image.LANCZOS)
+
+
+def generate_renditions(source_name, overwrite=False):
+    """Write every size/format rendition of ``source_name``. Returns how many were written."""
+    written = 0
+    with default_storage.open(source_name, "rb") as source:
+        image = ImageOps.exif_transpose(Image.open(source))
+        image = image.convert("RGB")
+        for size in settings.RENDITION_SIZES:
+            rendered = None
+            for fmt, (pil_format, _) in RENDITION_FORMATS.items():
+                name = rendition_name(source_name, size, fmt)
+                if not overwrite and default_storage.exists(name):
+                    continue
+                if rendered is None:
+                    rendered = render(image, size)
+                buffer = io.BytesIO()
+                rendered.save(buffer, pil_format, quality=settings.RENDITION_QUALITY)
+                if default_storage.exists(name):
+                    default_storage.delete(name)
+                default_storage.save(name, ContentFile(buffer.getvalue()))
+                written += 1
+    return written
+
+
+def _generate(source_name):
+    try:
+        generate_renditions(source_name)
+    except Exception:
+        logger.exception("Could not generate renditions for %s", source_name)
+
+
+def schedule_renditions(source_name):
+    """Generate the renditions in the worker pool, off the request path."""
+    executor.submit(_generate, source_name)
@@ -0,0 +1,37 @@
+from functools import partial
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models.signals import post_save
+
+from .pipeline import schedule_renditions
+from .utils import IMAGE_FIELDS, rendition_name
+
+
+def image_saved_receiver(sender, instance, field_names, **kwargs):
+    for field_name in field_names:
+        image = getattr(instance, field_name)
+        if not image:
+            continue
+        if default_storage.exists(rendition_name(image.name, next(iter(settings.RENDITION_SIZES)), "webp")):
+            continue
+        transaction.on_commit(partial(schedule_renditions, image.name))
+
+
+def connect_image_fields():
+    fields_by_model = {}
+    for model_label, field_name in IMAGE_FIELDS:
+        fields_by_model.setdefault(model_label, []).append(field_name)
+
+    for model_label, field_names in fields_by_model.items():
+        post_save.connect(
+            partial(image_saved_receiver, field_names=field_names),
+            sender=apps.get_model(model_label),
+            weak=False,
+            dispatch_uid=f"renditions:{model_label}",
+        )
+
+
+connect_image_fields()
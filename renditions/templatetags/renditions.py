@@ -0,0 +1,15 @@
+from django import template
+
+from renditions.utils import rendition_url
+
+register = template.Library()
+
+
+@register.filter
+def rendition(image, spec):
+    """
+    URL of a resized copy of ``image``: ``{{ food.image|rendition:"thumb" }}``
+    for JPEG, ``{{ food.image|rendition:"thumb.webp" }}`` for WebP.
+    """
+    size, _, fmt = spec.partition(".")
+    return rendition_url(image, size, fmt or "jpeg")
@@ -0,0 +1,93 @@
+import hashlib
+import os
+
+from django import forms
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import models
+from django.db.models.fields.files import ImageFieldFile
+from django.utils.deconstruct import deconstructible
+
+from accounts.validators import check_upload_error
+
+RENDITION_FORMATS = {
+    "jpeg": ("JPEG", "jpg"),
+    "webp": ("WEBP", "webp"),
+}
+
+# Every image field that gets renditions, as (app_label.Model, field name)
+IMAGE_FIELDS = [
+    ("menu.FoodItem", "image"),
+    ("accounts.UserProfile", "profile_picture"),
+    ("accounts.UserProfile", "cover_photo"),
+    ("vendor.Vendor", "vendor_license"),
+]
+
+
+def content_hash_name(filename, content):
+    """``filename`` renamed after a hash of ``content``, e.g. ``3f2a9c0d1e4b5a6c.jpg``."""
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    ext = os.path.splitext(filename)[1].lower()
+    return f"{digest.hexdigest()[:16]}{ext}"
+
+
+class HashedImageFieldFile(ImageFieldFile):
+    def save(self, name, content, save=True):
+        # The name comes from the content being saved, not from the file the instance had before
+        super().save(content_hash_name(name, content), content, save)
+
+
+class HashedImageFormField(forms.ImageField):
+    """Form ImageField saying why an upload was refused while streaming instead of "Upload a valid image"."""
+
+    def to_python(self, data):
+        check_upload_error(data)
+        return super().to_python(data)
+
+
+class HashedImageField(models.ImageField):
+    """
+    ImageField whose files are named after a hash of their content, e.g.
+    ``foodimages/3f2a9c0d1e4b5a6c.jpg`` with ``HashedUploadTo("foodimages")``.
+    New content always gets a new name, so the renditions derived from it can
+    be cached forever.
+    """
+
+    attr_class = HashedImageFieldFile
+
+    def formfield(self, **kwargs):
+        return super().formfield(**{"form_class": HashedImageFormField, **kwargs})
+
+
+@deconstructible
+class HashedUploadTo:
+    """``upload_to`` of a HashedImageField: puts the already hashed name under ``prefix``."""
+
+    # field_name is unused, existing migrations still pass it
+    def __init__(self, prefix, field_name=None):
+        self.prefix = prefix
+        self.field_name = field_name
+
+    def __call__(self, instance, filename):
+        return f"{self.prefix}/{filename}"
+
+
+def rendition_name(source_name, size, fmt):
+    stem = os.path.splitext(source_name)[0]
+    return f"renditions/{stem}/{size}.{RENDITION_FORMATS[fmt][1]}"
+
+
+def rendition_url(image, size, fmt="jpeg"):
+    """URL of the rendition, or of the original while it is still being generated."""
+    if not image:
+        return ""
+    name = rendition_name(image.name, size, fmt)
+    key = f"rendition:{name}"
+    if cache.get(key) or default_storage.exists(name):
+        cache.set(key, True, settings.RENDITION_EXISTS_TIMEOUT)
+        return default_storage.url(name)
+    return image.url